@@ -0,0 +1,92 @@
+"""Micro-benchmark of binding tools and structured outputs on every call vs once.
+
+Times the bindings made by the graph nodes, built again on every call as the
+nodes used to do and looked up in the registry, next to a whole call of the
+fake chat model for scale. With `--provider` the real provider class of
+`DEFAULT_MODEL` is bound instead, which needs its API key to be set but
+doesn't make any request.
+
+Usage:
+    python -m benchmarks.bindings --number 2000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import use_fake_chat_model
+from examples.common.llm import (
+    get_chat_model,
+    get_model_with_structured_output,
+    get_model_with_tools,
+)
+from examples.deep_researcher import drafter
+from examples.deep_researcher.chat_with_user import ChatWithUserResponse
+from examples.deep_researcher.translate.state import ConductUpdate, NoUpdate
+
+BINDINGS: dict[str, tuple[Callable[[Any], Any], Callable[[], Any]]] = {
+    "chat_with_user structured output": (
+        lambda chat_model: chat_model.with_structured_output(ChatWithUserResponse),
+        lambda: get_model_with_structured_output(ChatWithUserResponse),
+    ),
+    "translate glossary tools": (
+        lambda chat_model: chat_model.bind_tools([ConductUpdate, NoUpdate]),
+        lambda: get_model_with_tools([ConductUpdate, NoUpdate]),
+    ),
+    "drafter document tools": (
+        lambda chat_model: chat_model.bind_tools(drafter.tools),
+        lambda: get_model_with_tools(drafter.tools),
+    ),
+}
+
+
+def per_call_us(function: Callable[[], Any], number: int) -> float:
+    """Best time of a call in microseconds."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=1000, help="calls per timing")
+    parser.add_argument(
+        "--provider", action="store_true", help="bind the real provider chat model"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    if not args.provider:
+        use_fake_chat_model(FakeChatModel())
+    chat_model = get_chat_model()
+
+    results = []
+    for name, (build, lookup) in BINDINGS.items():
+        result = {
+            "binding": name,
+            "build_us": per_call_us(lambda: build(chat_model), args.number),
+            "cached_us": per_call_us(lookup, args.number),
+        }
+        if not args.provider:
+            runnable = lookup()
+            result["invoke_us"] = per_call_us(
+                lambda: runnable.invoke("Translate this"), max(1, args.number // 10)
+            )
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'binding':<34} {'build us':>10} {'cached us':>10} {'invoke us':>10}")
+    for result in results:
+        invoke = f"{result['invoke_us']:>10.1f}" if "invoke_us" in result else f"{'-':>10}"
+        print(
+            f"{result['binding']:<34} {result['build_us']:>10.1f} "
+            f"{result['cached_us']:>10.1f} {invoke}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Measure the prompt size and chatbot node latency over a long thread.
+
+One thread of the `memory_chatbot` graph is run for many turns with the fake
+chat model, once sending the whole history, once with the history trimmed to
+a token budget and once also summarizing the trimmed turns. The prompt size
+is the estimated tokens of the messages sent for the answer, and the latency
+is the wall time of the chatbot node, summaries included. The checkpoints
+are saved between the steps, so their serialization isn't counted.
+
+Usage:
+    python -m benchmarks.chatbot_trimming --turns 1000
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages.utils import count_tokens_approximately
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import NodeTimer, use_fake_chat_model
+
+MODES: dict[str, dict[str, Any]] = {
+    "whole history": {},
+    "trimmed": {"trim_history": True},
+    "trimmed + summary": {"trim_history": True, "summarize_trimmed": True},
+}
+
+
+class PromptRecorder(BaseCallbackHandler):
+    """Callback handler recording the estimated tokens of every prompt."""
+
+    def __init__(self):
+        self.prompts: list[int] = []
+        self.summaries = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        prompt = messages[0]
+        if len(prompt) == 1 and "<Summary>" in str(prompt[0].content):
+            self.summaries += 1
+        else:
+            self.prompts.append(count_tokens_approximately(prompt))
+
+
+def run_thread(graph, configurable: dict[str, Any], turns: int) -> dict[str, Any]:
+    """Run a thread and record its prompts and node latencies."""
+    recorder = PromptRecorder()
+    timer = NodeTimer()
+    config = {
+        "configurable": {"thread_id": "benchmark", **configurable},
+        "callbacks": [recorder, timer],
+    }
+    latencies = []
+    started = time.perf_counter()
+    for turn in range(turns):
+        before = timer.totals["chatbot"]
+        graph.invoke(
+            {"messages": [{"role": "user", "content": f"Tell me more, part {turn}"}]},
+            config,
+            # Checkpoints are saved in a background thread by default, whose
+            # serialization of the whole history would be timed with the node
+            durability="sync",
+        )
+        latencies.append(timer.totals["chatbot"] - before)
+    return {
+        "elapsed_s": time.perf_counter() - started,
+        "last_prompt_tokens": recorder.prompts[-1],
+        "total_prompt_tokens": sum(recorder.prompts),
+        "summaries": recorder.summaries,
+        "first_50_ms": statistics.mean(latencies[:50]) * 1000,
+        "last_50_ms": statistics.mean(latencies[-50:]) * 1000,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--tokens", type=int, default=50, help="words per LLM answer")
+    parser.add_argument("--max-prompt-tokens", type=int, default=4000)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(FakeChatModel(tokens=args.tokens))
+    chatbot = importlib.import_module("examples.introduction.memory_chatbot.main")
+
+    results = []
+    for mode, configurable in MODES.items():
+        # A new checkpointer per mode
+        graph = chatbot.build_graph()
+        result = run_thread(
+            graph, {**configurable, "max_prompt_tokens": args.max_prompt_tokens}, args.turns
+        )
+        results.append({"mode": mode, **result})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'mode':<18} {'last prompt':>12} {'all prompts':>12} {'summaries':>9} "
+        f"{'first 50':>10} {'last 50':>10} {'total':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:<18} {result['last_prompt_tokens']:>12} "
+            f"{result['total_prompt_tokens']:>12} {result['summaries']:>9} "
+            f"{result['first_50_ms']:>7.2f} ms {result['last_50_ms']:>7.2f} ms "
+            f"{result['elapsed_s']:>6.1f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Compare the bytes and write latency of the SQLite checkpoints per serializer.
+
+A conversation of the `sqlite_memory_chatbot` graph is run with the fake chat
+model on an empty database per serializer: the default one, the compressed
+one, and the compressed one storing the messages once. The stored bytes
+include the message store, and the write latency is the time spent in the
+`put` and `put_writes` of the checkpointer.
+
+Usage:
+    python -m benchmarks.checkpoint_serde --turns 200
+"""
+
+import argparse
+import importlib
+import json
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import percentile, use_fake_chat_model
+from examples.common.checkpoint.serde import CompressedSerializer, MessageStore
+from examples.common.checkpoint.sqlite import sqlite_saver
+
+SERIALIZERS: dict[str, Callable[[str], Optional[CompressedSerializer]]] = {
+    "default": lambda path: None,
+    "compressed": lambda path: CompressedSerializer(),
+    "compressed + messages": lambda path: CompressedSerializer(messages=MessageStore(path)),
+}
+
+
+def stored_bytes(path: str) -> int:
+    """Bytes of the checkpoints, writes and messages of a database."""
+    conn = sqlite3.connect(path)
+    try:
+        size = 0
+        for query in (
+            "SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints",
+            "SELECT SUM(LENGTH(value)) FROM writes",
+            "SELECT SUM(LENGTH(data)) FROM checkpoint_messages",
+        ):
+            try:
+                (value,) = conn.execute(query).fetchone()
+            except sqlite3.OperationalError:
+                # No message store
+                continue
+            size += value or 0
+        return size
+    finally:
+        conn.close()
+
+
+def timed(function: Callable, latencies: list[float]) -> Callable:
+    """Wrap a function to record the duration of every call."""
+
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def benchmark(name: str, turns: int) -> dict[str, Any]:
+    """Run a conversation with a serializer and measure its checkpoints."""
+    chatbot = importlib.import_module("examples.introduction.sqlite_memory_chatbot.main")
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "checkpoints.sqlite")
+        serde = SERIALIZERS[name](path)
+        writes = []
+        with sqlite_saver(path, serde=serde) as checkpointer:
+            checkpointer.put = timed(checkpointer.put, writes)
+            checkpointer.put_writes = timed(checkpointer.put_writes, writes)
+            graph = chatbot.build_graph(checkpointer)
+            config = {"configurable": {"thread_id": "benchmark"}}
+            for turn in range(turns):
+                graph.invoke(
+                    {"messages": [{"role": "user", "content": f"Tell me more, part {turn}"}]},
+                    config,
+                )
+            started = time.perf_counter()
+            messages = graph.get_state(config).values["messages"]
+            load = time.perf_counter() - started
+        if serde is not None and serde.messages is not None:
+            serde.messages.close()
+        size = stored_bytes(path)
+
+    return {
+        "serializer": name,
+        "turns": turns,
+        "messages": len(messages),
+        "bytes_per_turn": size / turns,
+        "write_mean_us": statistics.mean(writes) * 1e6,
+        "write_p99_us": percentile(writes, 0.99) * 1e6,
+        "load_ms": load * 1000,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=100, help="words per LLM answer")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(FakeChatModel(tokens=args.tokens))
+    results = [benchmark(name, args.turns) for name in SERIALIZERS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'serializer':<22} {'bytes/turn':>11} {'write us':>9} {'p99 us':>9} {'load ms':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['serializer']:<22} {result['bytes_per_turn']:>11.0f} "
+            f"{result['write_mean_us']:>9.0f} {result['write_p99_us']:>9.0f} "
+            f"{result['load_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
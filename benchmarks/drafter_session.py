@@ -0,0 +1,142 @@
+"""Benchmark a long drafting session of the drafter graph with a scripted model.
+
+The model writes a document, then edits one of its lines per step and saves
+it on the last step, so every step runs the agent and the tools once. The
+session is run once to time the steps and once more to measure the memory.
+
+Usage:
+    python -m benchmarks.drafter_session --steps 500
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from benchmarks.graphs import use_fake_chat_model
+from examples.common.llm import chat_models
+
+
+class DraftingModel(BaseChatModel):
+    """Chat model editing a line of the document per call, then saving it."""
+
+    steps: int = 500
+    """Calls before saving the document."""
+    lines: int = 200
+    """Lines of the document."""
+    prompt_sizes: list[int] = Field(default_factory=list)
+    """Number of messages of every prompt."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "drafting-model"
+
+    def bind_tools(self, tools, **kwargs):
+        """The tool calls are scripted, the tools are not needed."""
+        return self
+
+    def _tool_call(self, step: int) -> dict[str, Any]:
+        """Tool call of a step of the session."""
+        if step == 0:
+            content = "".join(f"Line {line} of the draft.\n" for line in range(1, self.lines + 1))
+            return {"name": "update", "args": {"content": content}}
+        if step >= self.steps - 1:
+            return {"name": "save", "args": {"filename": "draft"}}
+        line = step % self.lines + 1
+        return {
+            "name": "replace_lines",
+            "args": {
+                "start_line": line,
+                "end_line": line,
+                "content": f"Line {line} edited at step {step}.",
+            },
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        step = len(self.prompt_sizes)
+        self.prompt_sizes.append(len(messages))
+        tool_call = {**self._tool_call(step), "id": f"call_{step}"}
+        message = AIMessage(content=f"Done with step {step}.", tool_calls=[tool_call])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def run_session(steps: int, lines: int, measure_memory: bool = False) -> dict[str, Any]:
+    """Run a drafting session and time its steps."""
+    from examples.deep_researcher import drafter
+
+    model = DraftingModel(steps=steps, lines=lines)
+    use_fake_chat_model(model)
+    # Drop the model of the previous session
+    chat_models.clear()
+    app = drafter.build_graph()
+    config = {"recursion_limit": 2 * steps + 10}
+
+    step_times = []
+    if measure_memory:
+        tracemalloc.start()
+    with tempfile.TemporaryDirectory() as directory, contextlib.chdir(directory):
+        # The nodes print their progress
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = last = time.perf_counter()
+            for state in app.stream(
+                {"messages": [], "document": ""}, config, stream_mode="values"
+            ):
+                now = time.perf_counter()
+                step_times.append(now - last)
+                last = now
+            elapsed = time.perf_counter() - started
+    if measure_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # Two values per step, after the agent and after the tools
+    per_step = [a + b for a, b in zip(step_times[1::2], step_times[2::2])]
+    result = {
+        "steps": len(model.prompt_sizes),
+        "elapsed_s": elapsed,
+        "first_50_ms": statistics.mean(per_step[:50]) * 1000,
+        "last_50_ms": statistics.mean(per_step[-50:]) * 1000,
+        "messages": len(state["messages"]),
+        "last_prompt_messages": model.prompt_sizes[-1],
+    }
+    if measure_memory:
+        result["peak_mb"] = peak / 1e6
+    return result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=200, help="lines of the document")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    result = run_session(args.steps, args.lines)
+    result["peak_mb"] = run_session(args.steps, args.lines, measure_memory=True)["peak_mb"]
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"steps                   {result['steps']}")
+    print(f"total                   {result['elapsed_s']:.2f} s")
+    print(f"first 50 steps          {result['first_50_ms']:.2f} ms/step")
+    print(f"last 50 steps           {result['last_50_ms']:.2f} ms/step")
+    print(f"messages in the state   {result['messages']}")
+    print(f"messages in last prompt {result['last_prompt_messages']}")
+    print(f"peak memory             {result['peak_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
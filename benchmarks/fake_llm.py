@@ -0,0 +1,181 @@
+"""Deterministic fake chat model to benchmark the graphs without network access.
+
+The answer only depends on the prompt, so runs are reproducible. Tools bound
+with `bind_tools` are always called, with arguments built from their JSON
+schema, which also makes the default `with_structured_output` work.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Iterator, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+WORDS = (
+    "el la de que y en un una los las por con para como más pero sus le ya o "
+    "este sí porque esta entre cuando muy sin sobre también me hasta hay donde "
+    "quien desde todo nos durante todos uno les ni contra otros ese eso ante"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering deterministic text or tool calls after a fixed delay."""
+
+    latency: float = 0.0
+    """Seconds before the answer, or before the first token when streaming."""
+    token_latency: float = 0.0
+    """Seconds between two streamed tokens."""
+    tokens: int = 50
+    """Number of words in every text answer."""
+    tool_name: Optional[str] = None
+    """Tool to call when several are bound. Defaults to the first one."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], tool_choice: Any = None, **kwargs):
+        """Bind tools that every answer will call."""
+        formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted_tools, tool_choice=tool_choice, **kwargs)
+
+    def _answer(self, messages: list[BaseMessage], **kwargs) -> AIMessage:
+        """Build the deterministic answer to a prompt."""
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        usage = {
+            "input_tokens": len(prompt.split()),
+            "output_tokens": self.tokens,
+            "total_tokens": len(prompt.split()) + self.tokens,
+        }
+
+        tools = kwargs.get("tools")
+        if tools:
+            functions = [tool["function"] for tool in tools]
+            tool_choice = kwargs.get("tool_choice")
+            names = [function["name"] for function in functions]
+            if isinstance(tool_choice, str) and tool_choice in names:
+                name = tool_choice
+            elif self.tool_name in names:
+                name = self.tool_name
+            else:
+                name = names[0]
+            function = functions[names.index(name)]
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": name,
+                        "args": _fake_value(function.get("parameters", {}), rng),
+                        "id": f"call_{rng.getrandbits(64):016x}",
+                    }
+                ],
+                usage_metadata=usage,
+            )
+
+        words = [rng.choice(WORDS) for _ in range(self.tokens)]
+        return AIMessage(content=" ".join(words), usage_metadata=usage)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency + self.token_latency * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=self._answer(messages, **kwargs))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency + self.token_latency * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=self._answer(messages, **kwargs))])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for chunk in self._chunks(self._answer(messages, **kwargs)):
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            time.sleep(self.token_latency)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ):
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._answer(messages, **kwargs)):
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(self.token_latency)
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        """Split an answer into one chunk per word, or a single tool call chunk."""
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"], ensure_ascii=False),
+                            "id": call["id"],
+                            "index": 0,
+                        }
+                        for call in message.tool_calls
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+
+        words = message.content.split(" ")
+        for index, word in enumerate(words):
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if index == 0 else " " + word,
+                    usage_metadata=message.usage_metadata if index == 0 else None,
+                )
+            )
+
+
+def _fake_value(schema: dict, rng: random.Random) -> Any:
+    """Build a deterministic value matching a JSON schema."""
+    if "anyOf" in schema:
+        return _fake_value(schema["anyOf"][0], rng)
+    schema_type = schema.get("type", "object")
+    if schema_type == "object":
+        return {
+            name: _fake_value(property_schema, rng)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [_fake_value(schema.get("items", {}), rng)]
+    if schema_type == "boolean":
+        return False
+    if schema_type in ("integer", "number"):
+        return 0
+    if "enum" in schema:
+        return schema["enum"][0]
+    return " ".join(rng.choice(WORDS) for _ in range(3))
@@ -0,0 +1,75 @@
+"""Micro-benchmark of compiling the graphs vs running them.
+
+Times compiling the `custom_tools_chatbot` graph, getting it from the cache
+of compiled graphs, and running a turn of it with a model calling one tool
+then answering. A graph compiled on every turn, as the chatbot used to do,
+shows up as a compile time close to or above the turn time.
+
+Usage:
+    python -m benchmarks.graph_compile --number 200
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import timeit
+from typing import Any, Callable
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import use_fake_chat_model
+
+
+class OneToolCallModel(FakeChatModel):
+    """Fake model calling a tool, then answering once it has the tool result."""
+
+    def _answer(self, messages, **kwargs) -> AIMessage:
+        if messages and isinstance(messages[-1], ToolMessage):
+            kwargs.pop("tools", None)
+        return super()._answer(messages, **kwargs)
+
+
+def per_call_us(function: Callable[[], Any], number: int) -> float:
+    """Best time of a call in microseconds."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100, help="calls per timing")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(OneToolCallModel(tool_name="show_gyms_city"))
+    chatbot = importlib.import_module("examples.introduction.custom_tools_chatbot.main")
+    graph = chatbot.get_graph()
+    turn = {"messages": [{"role": "user", "content": "Which gyms are there in Barcelona?"}]}
+
+    def invoke():
+        # The tools print what they do
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph.invoke(turn)
+
+    result = {
+        "compile_us": per_call_us(chatbot.build_graph, args.number),
+        "cached_us": per_call_us(chatbot.get_graph, args.number),
+        "invoke_us": per_call_us(invoke, args.number),
+    }
+    result["compile_per_invoke"] = result["compile_us"] / result["invoke_us"]
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"compile             {result['compile_us']:>10.1f} us")
+    print(f"cached graph        {result['cached_us']:>10.1f} us")
+    print(f"turn with one tool  {result['invoke_us']:>10.1f} us")
+    print(f"compile / turn      {result['compile_per_invoke']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Benchmark every graph registered in langgraph.json with a fake chat model.
+
+`init_chat_model` is replaced by `FakeChatModel` before the graphs are
+imported, so the benchmark runs offline and mostly measures the framework and
+our own code. Interrupts are answered with a fixed script per graph, and the
+translate glossary and translation memory live in a temporary directory.
+
+Usage:
+    python -m benchmarks.graphs --runs 200 --latency 0.01
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import langchain.chat_models
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+
+from benchmarks.fake_llm import FakeChatModel
+
+LANGGRAPH_CONFIG = Path(__file__).parent.parent / "langgraph.json"
+
+TRANSLATE_TEXT = "\n\n".join(
+    f"Clause {i}. The registrar shall keep the global history of every tree "
+    "planted in the park, and the contractor shall deliver it within thirty days."
+    for i in range(6)
+)
+
+
+@dataclass
+class Scenario:
+    """Input of a benchmarked graph and the answers to its interrupts."""
+
+    input: dict[str, Any]
+    resumes: list[Any] = field(default_factory=list)
+    configurable: dict[str, Any] = field(default_factory=dict)
+
+
+def user_message(content: str) -> dict[str, Any]:
+    """Graph input with a single user message."""
+    return {"messages": [{"role": "user", "content": content}]}
+
+
+SCENARIOS = {
+    # Translate, ask for a correction, skip the proposed glossary term, approve
+    "translate": Scenario(
+        input=user_message(TRANSLATE_TEXT),
+        resumes=["Use 'árbol' for tree", "no", "ok"],
+        configurable={"chunk_size": 400, "use_translation_memory": False},
+    ),
+    "chat_with_user": Scenario(input=user_message("What did we talk about?")),
+}
+DEFAULT_SCENARIO = Scenario(input=user_message("What do you know about LangGraph?"))
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Callback handler adding up the wall time spent in every graph node."""
+
+    def __init__(self):
+        self.totals: dict[str, float] = defaultdict(float)
+        self._starts: dict[Any, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:
+            with self._lock:
+                self._starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._stop(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._stop(run_id)
+
+    def _stop(self, run_id):
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started is not None:
+                node, start = started
+                self.totals[node] += time.perf_counter() - start
+
+
+def use_fake_chat_model(model: FakeChatModel):
+    """Make every `init_chat_model` call return the fake model."""
+    langchain.chat_models.init_chat_model = lambda *args, **kwargs: model
+
+
+def load_graphs(names: list[str] | None = None) -> dict[str, Any]:
+    """Import the compiled graphs registered in langgraph.json."""
+    registered = json.loads(LANGGRAPH_CONFIG.read_text())["graphs"]
+    graphs = {}
+    for name, target in registered.items():
+        if names and name not in names:
+            continue
+        path, attribute = target.split(":")
+        module_name = ".".join(Path(path).with_suffix("").parts)
+        module = importlib.import_module(module_name)
+        graphs[name] = (module, getattr(module, attribute))
+    return graphs
+
+
+def isolate_translate_storage(module, directory: Path):
+    """Point the translate graph at an empty glossary and translation memory."""
+    from examples.deep_researcher.translate.glossary_manager import GlossaryManager
+    from examples.deep_researcher.translate.translation_memory import (
+        TranslationMemory,
+    )
+
+    module.glossary_manager = GlossaryManager(directory / "glossary.json")
+    module.translation_memory = TranslationMemory(directory / "translation_memory.sqlite")
+
+
+def run_scenario(graph, scenario: Scenario, callbacks: list) -> float:
+    """Run a scenario on a new thread and return its wall time."""
+    config = {
+        "configurable": {"thread_id": str(uuid.uuid4()), **scenario.configurable},
+        "callbacks": callbacks,
+    }
+    started = time.perf_counter()
+    result = graph.invoke(scenario.input, config)
+    for resume in scenario.resumes:
+        if "__interrupt__" not in result:
+            break
+        result = graph.invoke(Command(resume=resume), config)
+    return time.perf_counter() - started
+
+
+async def arun_scenario(graph, scenario: Scenario, callbacks: list) -> float:
+    """Async version of `run_scenario`, driving the graph with `ainvoke`."""
+    config = {
+        "configurable": {"thread_id": str(uuid.uuid4()), **scenario.configurable},
+        "callbacks": callbacks,
+    }
+    started = time.perf_counter()
+    result = await graph.ainvoke(scenario.input, config)
+    for resume in scenario.resumes:
+        if "__interrupt__" not in result:
+            break
+        result = await graph.ainvoke(Command(resume=resume), config)
+    return time.perf_counter() - started
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def benchmark(name: str, graph, runs: int, warmup: int) -> dict[str, Any]:
+    """Run a graph repeatedly and collect its timings."""
+    scenario = SCENARIOS.get(name, DEFAULT_SCENARIO)
+    # Interrupts need a checkpointer
+    graph = graph.builder.compile(checkpointer=InMemorySaver())
+
+    # The nodes print their progress
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            run_scenario(graph, scenario, [])
+
+        timer = NodeTimer()
+        latencies = [run_scenario(graph, scenario, [timer]) for _ in range(runs)]
+    total = sum(latencies)
+    return {
+        "graph": name,
+        "runs": runs,
+        "throughput": runs / total,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "nodes_ms": {
+            node: node_total / runs * 1000 for node, node_total in timer.totals.items()
+        },
+    }
+
+
+def print_report(results: list[dict[str, Any]]):
+    """Print the timings of every graph."""
+    print(f"{'graph':<16} {'runs':>6} {'runs/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(
+            f"{result['graph']:<16} {result['runs']:>6} {result['throughput']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+        for node, node_ms in sorted(result["nodes_ms"].items(), key=lambda item: -item[1]):
+            print(f"    {node:<30} {node_ms:>9.2f} ms/run")
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per LLM call")
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=50, help="words per LLM answer")
+    parser.add_argument("--graph", action="append", help="only benchmark this graph")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(
+        FakeChatModel(
+            latency=args.latency, token_latency=args.token_latency, tokens=args.tokens
+        )
+    )
+    graphs = load_graphs(args.graph)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = []
+        for name, (module, graph) in graphs.items():
+            if name == "translate":
+                isolate_translate_storage(module, Path(directory))
+            results.append(benchmark(name, graph, args.runs, args.warmup))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
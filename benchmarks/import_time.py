@@ -0,0 +1,107 @@
+"""Benchmark how long importing every graph module takes.
+
+Every module is imported in a fresh interpreter with `python -X importtime`,
+so the numbers are cold-start costs. The benchmark also reports whether the
+import already loaded a chat model provider, which should only happen when a
+node first calls a model.
+
+Usage:
+    python -m benchmarks.import_time --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.graphs import LANGGRAPH_CONFIG
+
+ROOT = Path(__file__).parent.parent
+
+# Graph modules that are not registered in langgraph.json
+EXTRA_MODULES = [
+    "examples.deep_researcher.basic_translate",
+    "examples.deep_researcher.drafter",
+]
+
+# Packages that are only needed once a model is called
+PROVIDER_MODULES = ["langchain.chat_models", "langchain_google_genai"]
+
+# A plain import statement, -X importtime does not report importlib.import_module
+PROBE = """
+import json, sys
+exec("import " + sys.argv[1])
+print(json.dumps([name for name in sys.argv[2:] if name in sys.modules]))
+"""
+
+
+def graph_modules() -> list[str]:
+    """Get the module of every registered graph, then the extra ones."""
+    registered = json.loads(LANGGRAPH_CONFIG.read_text())["graphs"].values()
+    modules = [
+        ".".join(Path(target.split(":")[0]).with_suffix("").parts)
+        for target in registered
+    ]
+    return modules + [module for module in EXTRA_MODULES if module not in modules]
+
+
+def import_time(module: str) -> tuple[float, list[str]]:
+    """Import a module in a new interpreter.
+
+    Returns:
+        The cumulative import time of the module in milliseconds and the
+        provider modules the import loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, module, *PROVIDER_MODULES],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative_us = int(fields[1])
+    return cumulative_us / 1000, json.loads(result.stdout)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for module in graph_modules():
+        timings = []
+        for _ in range(args.repeat):
+            elapsed_ms, providers = import_time(module)
+            timings.append(elapsed_ms)
+        results.append(
+            {
+                "module": module,
+                "median_ms": statistics.median(timings),
+                "providers_loaded": providers,
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'module':<50} {'import ms':>10}  providers loaded")
+    for result in results:
+        providers = ", ".join(result["providers_loaded"]) or "-"
+        print(f"{result['module']:<50} {result['median_ms']:>10.1f}  {providers}")
+
+
+if __name__ == "__main__":
+    main()
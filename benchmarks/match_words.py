@@ -0,0 +1,75 @@
+"""Benchmark the glossary matcher with and without the n-gram prefilter.
+
+Glossary terms and text are sampled from the docstrings of the standard
+library, so the benchmark runs offline on realistic English.
+
+Usage:
+    python -m benchmarks.match_words --terms 20000 --words 5000
+"""
+
+import argparse
+import random
+import re
+import sysconfig
+import time
+from pathlib import Path
+
+from examples.deep_researcher.translate.match_words import GlossaryMatcher
+
+
+def load_corpus() -> list[str]:
+    """Return the words of the standard library docstrings."""
+    words = []
+    for path in sorted(Path(sysconfig.get_paths()["stdlib"]).glob("*.py")):
+        source = path.read_text(encoding="utf-8", errors="ignore")
+        for docstring in re.findall(r'"""(.*?)"""', source, re.S):
+            words.extend(re.findall(r"[\w-]+", docstring.lower()))
+    return words
+
+
+def build_glossary(words: list[str], size: int) -> dict[str, dict[str, str]]:
+    """Build a glossary of one to three word phrases taken from the corpus."""
+    glossary = {}
+    while len(glossary) < size:
+        length = random.choice([1, 1, 2, 3])
+        start = random.randrange(len(words) - length)
+        phrase = " ".join(words[start : start + length])
+        glossary[phrase] = {"target": phrase.upper(), "note": ""}
+    return glossary
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=80)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    words = load_corpus()
+    glossary = build_glossary(words, args.terms)
+    start = random.randrange(len(words) - args.words)
+    text = " ".join(words[start : start + args.words])
+
+    print(f"{args.terms} terms, {args.words} words, threshold {args.threshold}")
+    results = []
+    for prefilter in (False, True):
+        matcher = GlossaryMatcher(glossary, args.threshold, prefilter=prefilter)
+        started = time.perf_counter()
+        matches = matcher.match(text)
+        elapsed = time.perf_counter() - started
+        results.append((matches, matcher.last_comparisons))
+        print(
+            f"prefilter={prefilter!s:<5} comparisons={matcher.last_comparisons:>12,} "
+            f"matches={len(matches):>6} time={elapsed:.3f}s"
+        )
+
+    (plain, plain_comparisons), (filtered, filtered_comparisons) = results
+    assert plain == filtered, "the prefilter changed the matches"
+    print(f"comparison reduction: {plain_comparisons / max(filtered_comparisons, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
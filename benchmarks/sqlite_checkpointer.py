@@ -0,0 +1,110 @@
+"""Compare SQLite checkpointers under concurrent threads of the SQLite chatbot.
+
+Every worker runs its own conversation with the `sqlite_memory_chatbot` graph
+and the fake chat model, reading its state back after every turn as a client
+showing the conversation would. The runs use a copy of the checked-in
+`checkpoints.sqlite`, once with `SqliteSaver` on a single shared connection as
+the chatbot used to, and once with the pooled saver of
+`examples.common.checkpoint.sqlite`.
+
+Usage:
+    python -m benchmarks.sqlite_checkpointer --threads 16 --turns 20
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import percentile, use_fake_chat_model
+from examples.common.checkpoint.sqlite import sqlite_saver
+
+DATABASE = Path(__file__).parent.parent / "checkpoints.sqlite"
+
+
+@contextlib.contextmanager
+def single_connection(path: str):
+    """`SqliteSaver` on one connection shared by every thread."""
+    with contextlib.closing(sqlite3.connect(path, check_same_thread=False)) as conn:
+        yield SqliteSaver(conn)
+
+
+SAVERS: dict[str, Callable[[str], Any]] = {
+    "single connection": single_connection,
+    "pooled": sqlite_saver,
+}
+
+
+def conversation(graph, turns: int) -> list[float]:
+    """Run a conversation and time its turns."""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        graph.invoke({"messages": [{"role": "user", "content": f"Message {turn}"}]}, config)
+        graph.get_state(config)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def benchmark(name: str, threads: int, turns: int) -> dict[str, Any]:
+    """Run the conversations on a fresh copy of the database."""
+    chatbot = importlib.import_module("examples.introduction.sqlite_memory_chatbot.main")
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "checkpoints.sqlite")
+        shutil.copy(DATABASE, path)
+        with SAVERS[name](path) as checkpointer:
+            graph = chatbot.build_graph(checkpointer)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(lambda _: conversation(graph, turns), range(threads)))
+            elapsed = time.perf_counter() - started
+
+    latencies = [latency for result in results for latency in result]
+    return {
+        "saver": name,
+        "turns": len(latencies),
+        "elapsed_s": elapsed,
+        "turns_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=20, help="turns per conversation")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per LLM call")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(FakeChatModel(latency=args.latency))
+    results = [benchmark(name, args.threads, args.turns) for name in SAVERS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'saver':<18} {'turns/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(
+            f"{result['saver']:<18} {result['turns_per_s']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare the throughput of concurrent translate threads run with invoke and ainvoke.
+
+Every thread runs the translate scenario of `benchmarks.graphs`, interrupts
+included, against the fake chat model. The sync graph needs a worker thread
+per thread in flight, so it is limited by the worker pool, while the async
+graph multiplexes every thread on a single event loop.
+
+Usage:
+    python -m benchmarks.translate_async --threads 200 --workers 16 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import (
+    SCENARIOS,
+    arun_scenario,
+    isolate_translate_storage,
+    load_graphs,
+    percentile,
+    run_scenario,
+    use_fake_chat_model,
+)
+
+
+def summarize(mode: str, latencies: list[float], elapsed: float) -> dict[str, Any]:
+    """Throughput and latency percentiles of a batch of threads."""
+    return {
+        "mode": mode,
+        "threads": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def run_sync(graph, threads: int, workers: int) -> dict[str, Any]:
+    """Run the threads with `invoke` on a pool of worker threads."""
+    scenario = SCENARIOS["translate"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(
+            executor.map(lambda _: run_scenario(graph, scenario, []), range(threads))
+        )
+    return summarize(f"sync ({workers} workers)", latencies, time.perf_counter() - started)
+
+
+async def run_async(graph, threads: int) -> dict[str, Any]:
+    """Run the threads with `ainvoke`, all of them in flight on the event loop."""
+    scenario = SCENARIOS["translate"]
+    started = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(arun_scenario(graph, scenario, []) for _ in range(threads))
+    )
+    return summarize("async", list(latencies), time.perf_counter() - started)
+
+
+def print_report(results: list[dict[str, Any]]):
+    """Print the timings of every mode."""
+    print(f"{'mode':<20} {'threads':>8} {'threads/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(
+            f"{result['mode']:<20} {result['threads']:>8} {result['throughput']:>10.1f} "
+            f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+        )
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=200, help="translations in flight")
+    parser.add_argument("--workers", type=int, default=16, help="worker threads of the sync run")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per LLM call")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(FakeChatModel(latency=args.latency))
+    module, graph = load_graphs(["translate"])["translate"]
+    # Interrupts need a checkpointer
+    graph = graph.builder.compile(checkpointer=InMemorySaver())
+
+    with tempfile.TemporaryDirectory() as directory:
+        isolate_translate_storage(module, Path(directory))
+        # The nodes print their progress
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Warm up the model registry, the glossary and the caches
+            run_scenario(graph, SCENARIOS["translate"], [])
+            results = [
+                run_sync(graph, args.threads, args.workers),
+                asyncio.run(run_async(graph, args.threads)),
+            ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure how soon a client sees the first translated text of the translate graph.
+
+One run streams the first translation with the `messages`, `custom` and
+`updates` modes at once and records when each mode shows translated text:
+the first token, the first finished chunk, and the node update with the
+whole translation, which is all a client waiting for the node gets.
+
+Usage:
+    python -m benchmarks.translate_streaming --runs 5 --latency 0.5 --token-latency 0.02
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.graphs import (
+    isolate_translate_storage,
+    load_graphs,
+    use_fake_chat_model,
+    user_message,
+)
+
+DOCUMENT = "\n\n".join(
+    f"Clause {i}. The registrar shall keep the global history of every tree "
+    "planted in the park, and the contractor shall deliver it within thirty days."
+    for i in range(40)
+)
+
+
+def first_output(graph, chunk_size: int) -> dict[str, float]:
+    """Stream the first translation and time the first output of every mode."""
+    config = {
+        "configurable": {
+            "thread_id": str(uuid.uuid4()),
+            "chunk_size": chunk_size,
+            "use_translation_memory": False,
+        }
+    }
+    times = {}
+    started = time.perf_counter()
+    for mode, event in graph.stream(
+        user_message(DOCUMENT), config, stream_mode=["messages", "custom", "updates"]
+    ):
+        elapsed = time.perf_counter() - started
+        if mode == "messages" and event[0].content:
+            times.setdefault("first_token", elapsed)
+        elif mode == "custom":
+            times.setdefault("first_chunk", elapsed)
+        elif mode == "updates" and "initial_translation" in event:
+            times.setdefault("whole_translation", elapsed)
+        elif mode == "updates" and "__interrupt__" in event:
+            break
+    return times
+
+
+def benchmark(graph, chunk_size: int, runs: int) -> dict[str, Any]:
+    """Median times of several runs."""
+    samples = [first_output(graph, chunk_size) for _ in range(runs)]
+    return {
+        "chunk_size": chunk_size,
+        **{
+            name: statistics.median(sample[name] for sample in samples) * 1000
+            for name in ("first_token", "first_chunk", "whole_translation")
+        },
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds to the first token")
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=100, help="words per LLM answer")
+    parser.add_argument(
+        "--chunk-size", type=int, action="append", help="chunk sizes to compare"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    use_fake_chat_model(
+        FakeChatModel(
+            latency=args.latency, token_latency=args.token_latency, tokens=args.tokens
+        )
+    )
+    module, graph = load_graphs(["translate"])["translate"]
+    # Interrupts need a checkpointer
+    graph = graph.builder.compile(checkpointer=InMemorySaver())
+
+    with tempfile.TemporaryDirectory() as directory:
+        isolate_translate_storage(module, Path(directory))
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [
+                benchmark(graph, chunk_size, args.runs)
+                for chunk_size in args.chunk_size or [0, 1000]
+            ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'chunk size':>10} {'first token':>12} {'first chunk':>12} {'whole':>12}")
+    for result in results:
+        print(
+            f"{result['chunk_size']:>10} {result['first_token']:>9.0f} ms "
+            f"{result['first_chunk']:>9.0f} ms {result['whole_translation']:>9.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
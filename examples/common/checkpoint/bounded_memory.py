@@ -0,0 +1,327 @@
+"""In-memory checkpointer keeping a bounded number of threads."""
+
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+# Most threads kept in memory by default
+MAX_THREADS = 1000
+
+# Most bytes of serialized checkpoints kept in memory by default
+MAX_BYTES = 256 * 1024 * 1024
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """`InMemorySaver` dropping the least recently used threads past a limit.
+
+    `InMemorySaver` keeps every checkpoint of every thread until the process
+    exits, so a long-running server runs out of memory. This saver counts the
+    serialized bytes of each thread and, once there are more threads or bytes
+    than allowed, evicts the threads used the longest time ago. Evicted
+    threads are lost, unless a `spill` checkpointer is given: they are copied
+    to it, for instance a `SqliteSaver`, and loaded back into memory the next
+    time they are used.
+
+    The thread being written is never evicted, so a single thread larger than
+    `max_bytes` stays in memory until another thread is used.
+
+    Example:
+        checkpointer = BoundedInMemorySaver(max_threads=100, spill=SqliteSaver(conn))
+        graph = graph_builder.compile(checkpointer=checkpointer)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: Optional[int] = MAX_THREADS,
+        max_bytes: Optional[int] = MAX_BYTES,
+        spill: Optional[BaseCheckpointSaver] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        """Initialize the saver.
+
+        Args:
+            max_threads: Most threads kept in memory, None for no limit.
+            max_bytes: Most bytes of serialized checkpoints and writes kept in
+                memory, None for no limit.
+            spill: Checkpointer receiving the evicted threads, None to drop them.
+            serde: Serializer of the checkpoints.
+        """
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.evictions = 0
+        self.spilled = 0
+        self.restored = 0
+
+        # Bytes of every thread in memory, the least recently used first
+        self._threads: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        # Keys of the blobs of every thread, so evicting a thread doesn't
+        # scan the blobs of all the others
+        self._blob_keys: defaultdict[str, set[tuple]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes of serialized checkpoints and writes in memory."""
+        return self._size
+
+    @property
+    def thread_count(self) -> int:
+        """Threads in memory."""
+        return len(self._threads)
+
+    def stats(self) -> dict[str, int]:
+        """Current memory usage and eviction counters, to log or export."""
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "bytes": self._size,
+                "evictions": self.evictions,
+                "spilled": self.spilled,
+                "restored": self.restored,
+            }
+
+    def _touch(self, thread_id: str, size: int = 0):
+        """Mark a thread as the most recently used one and count its new bytes."""
+        self._threads[thread_id] = self._threads.get(thread_id, 0) + size
+        self._threads.move_to_end(thread_id)
+        self._size += size
+
+    def _use(self, thread_id: str):
+        """Mark a thread as used, loading it back from the spill if it was evicted."""
+        if thread_id in self._threads:
+            self._threads.move_to_end(thread_id)
+        elif self.spill is not None:
+            self._restore(thread_id)
+
+    def _restore(self, thread_id: str):
+        """Load an evicted thread back from the spill checkpointer."""
+        saved = list(self.spill.list({"configurable": {"thread_id": thread_id}}))
+        if not saved:
+            return
+        # Back in memory before copying, the puts below use it
+        self._touch(thread_id)
+        # Oldest first, so the parents exist before their children
+        for checkpoint_tuple in reversed(saved):
+            copy_checkpoint(checkpoint_tuple, self)
+        self.spill.delete_thread(thread_id)
+        self.restored += 1
+        self._evict(keep=thread_id)
+
+    def _evict(self, keep: str):
+        """Evict the least recently used threads until the limits are met."""
+        while len(self._threads) > 1 and (
+            (self.max_threads is not None and len(self._threads) > self.max_threads)
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            thread_id = next(iter(self._threads))
+            if thread_id == keep:
+                self._threads.move_to_end(thread_id)
+                continue
+            if self.spill is not None:
+                for checkpoint_tuple in reversed(
+                    list(super().list({"configurable": {"thread_id": thread_id}}))
+                ):
+                    copy_checkpoint(checkpoint_tuple, self.spill)
+                self.spilled += 1
+            self._forget(thread_id)
+            self.evictions += 1
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get a checkpoint tuple, loading its thread back if it was evicted."""
+        with self._lock:
+            self._use(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, loading their thread back if it was evicted.
+
+        Without a thread in `config` only the threads in memory are listed.
+        """
+        with self._lock:
+            if config is not None:
+                self._use(config["configurable"]["thread_id"])
+            checkpoints = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from checkpoints
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, then evict threads if the limits are exceeded."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._use(thread_id)
+            new_blobs = [
+                key
+                for key in (
+                    (thread_id, checkpoint_ns, channel, version)
+                    for channel, version in new_versions.items()
+                )
+                if key not in self.blobs
+            ]
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            checkpoint_bytes, metadata_bytes, _ = self.storage[thread_id][checkpoint_ns][
+                checkpoint["id"]
+            ]
+            size = len(checkpoint_bytes[1]) + len(metadata_bytes[1])
+            for key in new_blobs:
+                size += len(self.blobs[key][1])
+            self._blob_keys[thread_id].update(new_blobs)
+            self._touch(thread_id, size)
+            self._evict(keep=thread_id)
+        return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save the writes of a task, then evict threads if the limits are exceeded."""
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            self._use(thread_id)
+            before = writes_size(self.writes.get(key))
+            super().put_writes(config, writes, task_id, task_path)
+            self._touch(thread_id, writes_size(self.writes.get(key)) - before)
+            self._evict(keep=thread_id)
+
+    def _forget(self, thread_id: str):
+        """Remove a thread from memory, leaving its copy in the spill if any."""
+        with self._lock:
+            # Writes belong to a checkpoint, reading a checkpoint also adds
+            # an empty entry for its writes
+            for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+                for checkpoint_id in checkpoints:
+                    self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            self._size -= self._threads.pop(thread_id, 0)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete the checkpoints and writes of a thread, from the spill too."""
+        with self._lock:
+            self._forget(thread_id)
+            if self.spill is not None:
+                self.spill.delete_thread(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Async version of `get_tuple`, loading evicted threads off the event loop."""
+        if self.spill is None:
+            return self.get_tuple(config)
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Async version of `list`, loading evicted threads off the event loop."""
+
+        def collect():
+            return list(self.list(config, filter=filter, before=before, limit=limit))
+
+        checkpoints = collect() if self.spill is None else await asyncio.to_thread(collect)
+        for checkpoint_tuple in checkpoints:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Async version of `put`, spilling evicted threads off the event loop."""
+        if self.spill is None:
+            return self.put(config, checkpoint, metadata, new_versions)
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Async version of `put_writes`, spilling evicted threads off the event loop."""
+        if self.spill is None:
+            return self.put_writes(config, writes, task_id, task_path)
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Async version of `delete_thread`, deleting from the spill off the event loop."""
+        if self.spill is None:
+            return self.delete_thread(thread_id)
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def writes_size(writes: Optional[dict]) -> int:
+    """Bytes of the serialized values of the writes of a checkpoint."""
+    if not writes:
+        return 0
+    return sum(len(value[1]) for _, _, value, _ in writes.values())
+
+
+def copy_checkpoint(checkpoint_tuple: CheckpointTuple, saver: BaseCheckpointSaver):
+    """Save a checkpoint and its pending writes to another checkpointer."""
+    configurable = checkpoint_tuple.config["configurable"]
+    parent = (
+        checkpoint_tuple.parent_config["configurable"]
+        if checkpoint_tuple.parent_config
+        else {}
+    )
+    config = {
+        "configurable": {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            **({"checkpoint_id": parent["checkpoint_id"]} if "checkpoint_id" in parent else {}),
+        }
+    }
+    checkpoint = checkpoint_tuple.checkpoint
+    saved_config = saver.put(
+        config, checkpoint, checkpoint_tuple.metadata, checkpoint["channel_versions"]
+    )
+
+    writes_by_task: dict[str, list[tuple[str, Any]]] = {}
+    for task_id, channel, value in checkpoint_tuple.pending_writes or ():
+        writes_by_task.setdefault(task_id, []).append((channel, value))
+    for task_id, writes in writes_by_task.items():
+        saver.put_writes(saved_config, writes, task_id)
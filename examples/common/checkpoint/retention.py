@@ -0,0 +1,404 @@
+"""Retention of the checkpoints of a SQLite checkpoint database.
+
+`SqliteSaver` keeps every checkpoint of every thread forever, and the
+database keeps growing with every turn. This prunes it:
+
+- keeps the last `keep_last` checkpoints of every thread and namespace,
+  1 to keep only the latest one,
+- deletes the threads idle for longer than `ttl_seconds`,
+- deletes the writes whose checkpoint no longer exists,
+- deletes the messages of the `MessageStore` no checkpoint references anymore,
+- gives the freed pages back to the file system with an incremental vacuum.
+
+Deletes run in small transactions, so a server using the database only waits
+for one batch at a time. Run it from the command line:
+
+    python -m examples.common.checkpoint.retention checkpoints.sqlite --keep-last 20 --ttl-days 30
+
+or in the background of a server with `start_retention`.
+
+Without incremental vacuum, the pages freed by the deletes are reused but
+the file never shrinks. SQLite databases don't have it by default, and
+turning it on needs a full `VACUUM` once, which rewrites the whole file,
+needs about as much free disk space as the database, and blocks every
+writer while it runs. Do it with `--enable-incremental-vacuum`, or
+`enable_vacuum=True` of `start_retention`, ideally while the server is idle.
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from examples.common.checkpoint.serde import (
+    MESSAGE_GRACE_SECONDS,
+    CompressedSerializer,
+    message_references,
+)
+from examples.common.checkpoint.sqlite import connect
+
+# Rows deleted per transaction
+BATCH_SIZE = 500
+
+# Pages freed per incremental vacuum step, 4 MB with the default page size
+VACUUM_PAGES = 1000
+
+# 100-ns intervals between the UUID epoch and the Unix epoch
+UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+@dataclass
+class RetentionPolicy:
+    """What to keep in a checkpoint database."""
+
+    keep_last: Optional[int] = None
+    """Checkpoints kept per thread and namespace, None to keep them all."""
+    ttl_seconds: Optional[float] = None
+    """Seconds since the last checkpoint before a thread is deleted, None to keep them."""
+    vacuum_pages: Optional[int] = VACUUM_PAGES
+    """Most pages freed per run, 0 for all of them, None to skip the vacuum."""
+
+    def __post_init__(self):
+        if self.keep_last is not None and self.keep_last < 1:
+            raise ValueError(f"keep_last must be at least 1 or None, got {self.keep_last}")
+
+
+@dataclass
+class RetentionReport:
+    """What a retention run deleted."""
+
+    threads: int = 0
+    checkpoints: int = 0
+    writes: int = 0
+    messages: int = 0
+    pages_freed: int = 0
+    seconds: float = 0.0
+
+
+def checkpoint_id_at(timestamp: float) -> str:
+    """Smallest checkpoint id created at a Unix timestamp.
+
+    Checkpoint ids are version 6 UUIDs, which start with their creation time,
+    so comparing ids as strings compares their creation times.
+    """
+    uuid_time = int(timestamp * 10_000_000) + UUID_EPOCH_OFFSET
+    time_high = f"{(uuid_time >> 12) & 0xFFFFFFFFFFFF:012x}"
+    return f"{time_high[:8]}-{time_high[8:]}-6{uuid_time & 0x0FFF:03x}-0000-000000000000"
+
+
+def delete_rows(conn: sqlite3.Connection, table: str, rowids: list[int]) -> int:
+    """Delete rows by rowid, committing every `BATCH_SIZE` rows."""
+    for start in range(0, len(rowids), BATCH_SIZE):
+        with conn:
+            conn.executemany(
+                f"DELETE FROM {table} WHERE rowid = ?",
+                ((rowid,) for rowid in rowids[start : start + BATCH_SIZE]),
+            )
+    return len(rowids)
+
+
+def prune_old_checkpoints(conn: sqlite3.Connection, keep_last: int) -> int:
+    """Delete all but the last `keep_last` checkpoints of every thread and namespace."""
+    if keep_last < 1:
+        # 0 or less would delete every checkpoint, and the threads with them
+        raise ValueError(f"keep_last must be at least 1, got {keep_last}")
+    rowids = [
+        rowid
+        for (rowid,) in conn.execute(
+            """SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                ) AS position
+                FROM checkpoints
+            )
+            WHERE position > ?""",
+            (keep_last,),
+        )
+    ]
+    return delete_rows(conn, "checkpoints", rowids)
+
+
+def prune_idle_threads(conn: sqlite3.Connection, ttl_seconds: float) -> tuple[int, int]:
+    """Delete the threads without checkpoint for `ttl_seconds`.
+
+    Returns:
+        The number of threads and checkpoints deleted.
+    """
+    cutoff = checkpoint_id_at(time.time() - ttl_seconds)
+    threads = [
+        thread_id
+        for (thread_id,) in conn.execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?",
+            (cutoff,),
+        )
+    ]
+    checkpoints = 0
+    for thread_id in threads:
+        rowids = [
+            rowid
+            for (rowid,) in conn.execute(
+                "SELECT rowid FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+        ]
+        checkpoints += delete_rows(conn, "checkpoints", rowids)
+    return len(threads), checkpoints
+
+
+def prune_orphan_writes(conn: sqlite3.Connection) -> int:
+    """Delete the writes whose checkpoint was deleted."""
+    rowids = [
+        rowid
+        for (rowid,) in conn.execute(
+            """SELECT rowid FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints
+                WHERE checkpoints.thread_id = writes.thread_id
+                AND checkpoints.checkpoint_ns = writes.checkpoint_ns
+                AND checkpoints.checkpoint_id = writes.checkpoint_id
+            )"""
+        )
+    ]
+    return delete_rows(conn, "writes", rowids)
+
+
+def prune_orphan_messages(
+    conn: sqlite3.Connection, grace_seconds: float = MESSAGE_GRACE_SECONDS
+) -> int:
+    """Delete the stored messages no checkpoint or write references anymore.
+
+    Every checkpoint and write is loaded to find the messages it references,
+    so this takes about as long as reading the whole database. Messages
+    stored less than `grace_seconds` ago are kept, their checkpoint may not
+    be saved yet. Does nothing when the database has no message store.
+
+    Returns:
+        The number of messages deleted.
+    """
+    if (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoint_messages'"
+        ).fetchone()
+        is None
+    ):
+        return 0
+
+    serde = CompressedSerializer()
+    referenced = set()
+    try:
+        for query in ("SELECT type, checkpoint FROM checkpoints", "SELECT type, value FROM writes"):
+            for type_, payload in conn.execute(query):
+                referenced.update(message_references(serde.loads_typed((type_, payload))))
+    except Exception as e:
+        # A message can't be deleted without knowing every reference to it
+        print(f"Error reading the checkpoints, stored messages are not pruned: {e}")
+        return 0
+
+    cutoff = time.time() - grace_seconds
+    rowids = [
+        rowid
+        for rowid, digest in conn.execute(
+            "SELECT rowid, digest FROM checkpoint_messages WHERE stored_at < ?", (cutoff,)
+        )
+        if digest not in referenced
+    ]
+    deleted = 0
+    for start in range(0, len(rowids), BATCH_SIZE):
+        with conn:
+            # Messages stored again since the scan may be referenced by now
+            deleted += conn.executemany(
+                "DELETE FROM checkpoint_messages WHERE rowid = ? AND stored_at < ?",
+                ((rowid, cutoff) for rowid in rowids[start : start + BATCH_SIZE]),
+            ).rowcount
+    return deleted
+
+
+def incremental_vacuum_enabled(conn: sqlite3.Connection) -> bool:
+    """Whether the database gives its free pages back with incremental vacuum."""
+    (auto_vacuum,) = conn.execute("PRAGMA auto_vacuum").fetchone()
+    return auto_vacuum == 2
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection):
+    """Switch the database to incremental vacuum.
+
+    Needs a full `VACUUM`, which rewrites the whole database and blocks its
+    writers meanwhile, so it is only run on request, and skipped when the
+    database already has incremental vacuum.
+    """
+    if incremental_vacuum_enabled(conn):
+        return
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int) -> int:
+    """Give up to `pages` free pages back to the file system, 0 for all of them.
+
+    Returns:
+        The number of pages freed, 0 when incremental vacuum isn't enabled.
+    """
+    if not incremental_vacuum_enabled(conn):
+        return 0
+    (before,) = conn.execute("PRAGMA freelist_count").fetchone()
+    conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    # Shrink the WAL file too, it grew with the deletes
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    (after,) = conn.execute("PRAGMA freelist_count").fetchone()
+    return before - after
+
+
+def apply_retention(conn: sqlite3.Connection, policy: RetentionPolicy) -> RetentionReport:
+    """Prune a checkpoint database following a retention policy."""
+    started = time.perf_counter()
+    report = RetentionReport()
+    if policy.ttl_seconds is not None:
+        report.threads, report.checkpoints = prune_idle_threads(conn, policy.ttl_seconds)
+    if policy.keep_last is not None:
+        report.checkpoints += prune_old_checkpoints(conn, policy.keep_last)
+    report.writes = prune_orphan_writes(conn)
+    report.messages = prune_orphan_messages(conn)
+    if policy.vacuum_pages is not None:
+        report.pages_freed = incremental_vacuum(conn, policy.vacuum_pages)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+class RetentionThread(threading.Thread):
+    """Background thread applying a retention policy at a fixed interval."""
+
+    def __init__(
+        self,
+        path: str,
+        policy: RetentionPolicy,
+        interval: float,
+        enable_vacuum: bool = False,
+    ):
+        """Initialize the thread.
+
+        Args:
+            path: Path of the checkpoint database.
+            policy: Retention policy to apply.
+            interval: Seconds between two runs.
+            enable_vacuum: Switch the database to incremental vacuum before
+                the first run if needed, with a full `VACUUM`.
+        """
+        super().__init__(name="checkpoint-retention", daemon=True)
+        self.path = path
+        self.policy = policy
+        self.interval = interval
+        self.enable_vacuum = enable_vacuum
+        self._vacuum_checked = False
+        self.last_report: Optional[RetentionReport] = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Apply the policy until stopped."""
+        while not self._stopped.is_set():
+            try:
+                conn = connect(self.path)
+                try:
+                    if not self._vacuum_checked:
+                        self._check_vacuum(conn)
+                    self.last_report = apply_retention(conn, self.policy)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Error applying the checkpoint retention: {e}")
+            self._stopped.wait(self.interval)
+
+    def _check_vacuum(self, conn: sqlite3.Connection):
+        """Enable incremental vacuum, or warn that the file won't shrink."""
+        if self.policy.vacuum_pages is not None and not incremental_vacuum_enabled(conn):
+            if self.enable_vacuum:
+                enable_incremental_vacuum(conn)
+            else:
+                print(
+                    f"Incremental vacuum is off in {self.path}, the file won't shrink: "
+                    "enable it with enable_vacuum=True"
+                )
+        self._vacuum_checked = True
+
+    def stop(self):
+        """Stop the thread after the current run."""
+        self._stopped.set()
+        self.join()
+
+
+def start_retention(
+    path: str = "checkpoints.sqlite",
+    policy: Optional[RetentionPolicy] = None,
+    interval: float = 3600,
+    enable_vacuum: bool = False,
+) -> RetentionThread:
+    """Apply a retention policy in the background every `interval` seconds.
+
+    Args:
+        path: Path of the checkpoint database.
+        policy: Retention policy, keeps the last 20 checkpoints of every
+            thread and deletes threads idle for 30 days by default.
+        interval: Seconds between two runs.
+        enable_vacuum: Switch the database to incremental vacuum on the first
+            run if needed. Its full `VACUUM` blocks the writers until the
+            whole file is rewritten.
+
+    Returns:
+        The started thread, `stop()` it on shutdown.
+    """
+    if policy is None:
+        policy = RetentionPolicy(keep_last=20, ttl_seconds=30 * 24 * 3600)
+    thread = RetentionThread(path, policy, interval, enable_vacuum)
+    thread.start()
+    return thread
+
+
+def positive_int(value: str) -> int:
+    """Argument type of the integers from 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not at least 1")
+    return number
+
+
+def main():
+    """Apply a retention policy to a checkpoint database once."""
+    parser = argparse.ArgumentParser(description="Prune a SQLite checkpoint database.")
+    parser.add_argument("path", nargs="?", default="checkpoints.sqlite")
+    parser.add_argument(
+        "--keep-last", type=positive_int, help="checkpoints kept per thread and namespace"
+    )
+    parser.add_argument("--ttl-days", type=float, help="delete threads idle for longer")
+    parser.add_argument(
+        "--vacuum-pages", type=int, default=VACUUM_PAGES, help="most pages freed, 0 for all"
+    )
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="switch the database to incremental vacuum with a full VACUUM first",
+    )
+    args = parser.parse_args()
+
+    policy = RetentionPolicy(
+        keep_last=args.keep_last,
+        ttl_seconds=args.ttl_days * 24 * 3600 if args.ttl_days is not None else None,
+        vacuum_pages=args.vacuum_pages,
+    )
+    conn = connect(args.path)
+    try:
+        if args.enable_incremental_vacuum:
+            enable_incremental_vacuum(conn)
+        elif policy.vacuum_pages is not None and not incremental_vacuum_enabled(conn):
+            print(
+                "Incremental vacuum is off, the file won't shrink: "
+                "enable it once with --enable-incremental-vacuum"
+            )
+        report = apply_retention(conn, policy)
+    finally:
+        conn.close()
+
+    for name, value in asdict(report).items():
+        print(f"{name:<12} {value:.2f}" if isinstance(value, float) else f"{name:<12} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Checkpoint serializer compressing payloads and storing messages once.
+
+The state of these graphs is mostly a list of messages, and `SqliteSaver`
+stores the whole state in every checkpoint, so a thread of n turns stores
+every message about n times. `CompressedSerializer` compresses what the
+checkpointer stores and, with a `MessageStore`, replaces every message by the
+hash of its content: a message is stored once in the `checkpoint_messages`
+table, however many checkpoints contain it.
+
+Example:
+    messages = MessageStore("checkpoints.sqlite")
+    with sqlite_saver("checkpoints.sqlite", serde=CompressedSerializer(messages=messages)) as checkpointer:
+        graph = graph_builder.compile(checkpointer=checkpointer)
+
+Checkpoints saved before are loaded as they are, so the serializer can be
+switched on for an existing database. Stored messages are not deleted with
+the checkpoints referencing them: `prune_orphan_messages` of
+`examples.common.checkpoint.retention` deletes the messages no checkpoint
+references anymore, and runs with the rest of the retention.
+"""
+
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from examples.common.checkpoint.sqlite import connect
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is optional, zlib is used without it
+    zstandard = None
+
+# Payloads smaller than this are stored uncompressed
+MIN_COMPRESSED_SIZE = 256
+
+# Compression level, zstd levels above 3 cost much more time for little gain
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Serialized messages kept in memory by a message store
+MAX_CACHED_MESSAGES = 4096
+
+# Key of the dictionaries replacing the messages
+MESSAGE_REFERENCE = "__checkpoint_message__"
+
+# Seconds an unreferenced message is kept after it was last stored, so a
+# message isn't pruned between being stored and its checkpoint being saved
+MESSAGE_GRACE_SECONDS = 3600
+
+
+class MessageStore:
+    """Messages of the checkpoints, stored once by the hash of their content.
+
+    Every message has the time it was last stored, refreshed at least every
+    half `MESSAGE_GRACE_SECONDS` while it is used, so pruning can leave alone
+    the messages whose checkpoint may not be saved yet.
+    """
+
+    def __init__(self, path: str, max_cached: int = MAX_CACHED_MESSAGES):
+        """Open the store, in its own table of a SQLite database.
+
+        Args:
+            path: Path of the database file, usually the checkpoint database.
+            max_cached: Most serialized messages kept in memory.
+        """
+        self.conn = connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS checkpoint_messages (
+                digest TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                data BLOB NOT NULL,
+                stored_at REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(checkpoint_messages)")]
+        if "stored_at" not in columns:
+            # Table created before messages were pruned
+            self.conn.execute(
+                "ALTER TABLE checkpoint_messages ADD COLUMN stored_at REAL NOT NULL DEFAULT 0"
+            )
+        self.conn.commit()
+        self.max_cached = max_cached
+        # digest -> ((type, data), time it was last stored or None if it was
+        # only read), the least recently used first
+        self._cache: OrderedDict[str, tuple[tuple[str, bytes], Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, digest: str, message: tuple[str, bytes], stored_at: Optional[float]):
+        """Keep a serialized message in memory."""
+        self._cache[digest] = (message, stored_at)
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+
+    def put(self, message: tuple[str, bytes]) -> str:
+        """Store a serialized message if it is new.
+
+        Returns:
+            The hash of the message.
+        """
+        # 128 bits are plenty to tell messages apart, and keep references short
+        digest = hashlib.blake2b(
+            message[0].encode() + b"\0" + message[1], digest_size=16
+        ).hexdigest()
+        now = time.time()
+        with self._lock:
+            stored_at = self._cache[digest][1] if digest in self._cache else None
+            if stored_at is not None and now - stored_at < MESSAGE_GRACE_SECONDS / 2:
+                self._cache.move_to_end(digest)
+                return digest
+            with self.conn:
+                self.conn.execute(
+                    """INSERT INTO checkpoint_messages (digest, type, data, stored_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (digest) DO UPDATE SET stored_at = excluded.stored_at""",
+                    (digest, *message, now),
+                )
+            self._remember(digest, message, now)
+        return digest
+
+    def get(self, digest: str) -> tuple[str, bytes]:
+        """Get a serialized message by its hash."""
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest][0]
+            row = self.conn.execute(
+                "SELECT type, data FROM checkpoint_messages WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Message {digest} is missing from the message store")
+            message = (row[0], bytes(row[1]))
+            self._remember(digest, message, None)
+        return message
+
+    def close(self):
+        """Close the connection of the store."""
+        with self._lock:
+            self.conn.close()
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer compressing the payloads of another one.
+
+    Payloads are compressed with zstd when `zstandard` is installed and zlib
+    otherwise, and their type gets a `+zstd` or `+zlib` suffix, the way
+    `EncryptedSerializer` marks encrypted payloads. Payloads without suffix
+    are loaded as they are.
+    """
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        *,
+        messages: Optional[MessageStore] = None,
+        min_size: int = MIN_COMPRESSED_SIZE,
+    ):
+        """Initialize the serializer.
+
+        Args:
+            serde: Serializer of the objects, `JsonPlusSerializer` by default.
+            messages: Store of the messages, None to keep them in the payloads.
+            min_size: Smallest payload compressed, in bytes.
+        """
+        self.serde = serde or JsonPlusSerializer()
+        self.messages = messages
+        self.min_size = min_size
+        # zstd contexts can't be shared between threads
+        self._local = threading.local()
+
+    def _zstd(self) -> tuple[Any, Any]:
+        """Compressor and decompressor of the current thread."""
+        if not hasattr(self._local, "zstd"):
+            self._local.zstd = (
+                zstandard.ZstdCompressor(level=ZSTD_LEVEL),
+                zstandard.ZstdDecompressor(),
+            )
+        return self._local.zstd
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize an object without compressing it."""
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize an object serialized by `dumps`."""
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize and compress an object."""
+        if self.messages is not None:
+            obj = self._store_messages(obj)
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        if zstandard is not None:
+            return f"{type_}+zstd", self._zstd()[0].compress(data)
+        return f"{type_}+zlib", zlib.compress(data, ZLIB_LEVEL)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize an object, compressed or not."""
+        type_, payload = data
+        base_type, _, compression = type_.rpartition("+")
+        if compression == "zstd":
+            if zstandard is None:
+                raise ValueError("Checkpoint compressed with zstd, install zstandard to load it")
+            type_, payload = base_type, self._zstd()[1].decompress(payload)
+        elif compression == "zlib":
+            type_, payload = base_type, zlib.decompress(payload)
+        obj = self.serde.loads_typed((type_, payload))
+        if self.messages is not None:
+            obj = self._load_messages(obj)
+        return obj
+
+    def _store_messages(self, obj: Any) -> Any:
+        """Replace the messages in an object by references to the message store."""
+        if isinstance(obj, BaseMessage):
+            return {MESSAGE_REFERENCE: self.messages.put(self.serde.dumps_typed(obj))}
+        # Exact types, subclasses such as named tuples are left as they are
+        if type(obj) is dict:
+            return {key: self._store_messages(value) for key, value in obj.items()}
+        if type(obj) in (list, tuple):
+            return type(obj)(self._store_messages(value) for value in obj)
+        return obj
+
+    def _load_messages(self, obj: Any) -> Any:
+        """Replace the references to the message store by their messages."""
+        if type(obj) is dict:
+            if len(obj) == 1 and MESSAGE_REFERENCE in obj:
+                return self.serde.loads_typed(self.messages.get(obj[MESSAGE_REFERENCE]))
+            return {key: self._load_messages(value) for key, value in obj.items()}
+        if type(obj) in (list, tuple):
+            return type(obj)(self._load_messages(value) for value in obj)
+        return obj
+
+
+
+def message_references(obj: Any) -> Iterator[str]:
+    """Hashes of the stored messages referenced by an object loaded without a message store."""
+    if type(obj) is dict:
+        if len(obj) == 1 and MESSAGE_REFERENCE in obj:
+            yield obj[MESSAGE_REFERENCE]
+            return
+        for value in obj.values():
+            yield from message_references(value)
+    elif type(obj) in (list, tuple):
+        for value in obj:
+            yield from message_references(value)
@@ -0,0 +1,267 @@
+"""SQLite checkpointers tuned for several threads using the same database.
+
+`SqliteSaver` runs every read and write of every thread on one connection
+behind one lock, and commits with SQLite's default `synchronous=FULL`, which
+syncs the disk on every checkpoint. The checkpointers created here use WAL
+mode, so reads don't wait for writes, with `synchronous=NORMAL` and a busy
+timeout. Reads go through a pool of read-only connections, and writes
+through a single writer connection, since SQLite allows one writer at a time
+anyway.
+
+Example:
+    with sqlite_saver("checkpoints.sqlite") as checkpointer:
+        graph = graph_builder.compile(checkpointer=checkpointer)
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import asynccontextmanager, closing, contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional, cast
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointMetadata, CheckpointTuple, SerializerProtocol
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.utils import search_where
+
+# Read connections kept open by default
+READERS = 4
+
+# Milliseconds a connection waits for a lock held by another one
+BUSY_TIMEOUT_MS = 5000
+
+# Pragmas of every connection. With WAL, `synchronous=NORMAL` only syncs the
+# disk at WAL checkpoints: a power loss can lose the last transactions but
+# never corrupts the database.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    # 16 MB page cache per connection, negative values are in KiB
+    "cache_size": -16000,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict[str, Any]):
+    """Set the pragmas of a connection."""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def connect(
+    path: str, read_only: bool = False, pragmas: Optional[dict[str, Any]] = None
+) -> sqlite3.Connection:
+    """Open a connection to a checkpoint database.
+
+    Args:
+        path: Path of the database file.
+        read_only: Open a connection refusing writes.
+        pragmas: Pragmas of the connection, `PRAGMAS` by default.
+
+    Returns:
+        The connection, usable from any thread.
+    """
+    conn = sqlite3.connect(
+        path,
+        check_same_thread=False,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        # Autocommit unless a transaction is opened explicitly, so readers
+        # don't keep a read transaction and the WAL from being checkpointed
+        isolation_level=None if read_only else "",
+    )
+    pragmas = PRAGMAS if pragmas is None else pragmas
+    if read_only:
+        # The journal mode is stored in the database, set by the writer
+        pragmas = {name: value for name, value in pragmas.items() if name != "journal_mode"}
+        pragmas["query_only"] = "ON"
+    apply_pragmas(conn, pragmas)
+    return conn
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """`SqliteSaver` reading through a pool of connections.
+
+    Writes keep going through the connection and lock of `SqliteSaver`,
+    reads borrow a read-only connection from the pool, so threads loading
+    their state don't wait for each other nor for the writer.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        readers: int = READERS,
+        pragmas: Optional[dict[str, Any]] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        """Open the writer connection, the readers are opened when needed.
+
+        Args:
+            path: Path of the database file.
+            readers: Most read connections open at the same time.
+            pragmas: Pragmas of the connections, `PRAGMAS` by default.
+            serde: Serializer of the checkpoints.
+        """
+        super().__init__(connect(path, pragmas=pragmas), serde=serde)
+        self.path = path
+        self.pragmas = pragmas
+        self._readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(readers)
+        self._all_readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read connection, waiting if they are all in use."""
+        if not self.is_setup:
+            with self.lock:
+                self.setup()
+        with self._reader_slots:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = connect(self.path, read_only=True, pragmas=self.pragmas)
+                with self._readers_lock:
+                    self._all_readers.append(conn)
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        """Get a cursor, on the writer for transactions and on a reader otherwise."""
+        if transaction:
+            with super().cursor(transaction=True) as cur:
+                yield cur
+            return
+        with self.reader() as conn, closing(conn.cursor()) as cur:
+            yield cur
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the database, newest first, on a read connection.
+
+        The rows are read before the first checkpoint is returned, so the
+        connection goes back to the pool even if the caller stops early.
+        """
+        where, param_values = search_where(config, filter, before)
+        query = f"""SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata
+        FROM checkpoints
+        {where}
+        ORDER BY checkpoint_id DESC"""
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self.reader() as conn:
+            rows = conn.execute(query, param_values).fetchall()
+            writes = [
+                conn.execute(
+                    "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchall()
+                for thread_id, checkpoint_ns, checkpoint_id, *_ in rows
+            ]
+
+        for (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_checkpoint_id,
+            type,
+            checkpoint,
+            metadata,
+        ), checkpoint_writes in zip(rows, writes):
+            yield CheckpointTuple(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                },
+                self.serde.loads_typed((type, checkpoint)),
+                cast(
+                    CheckpointMetadata,
+                    self.jsonplus_serde.loads(metadata) if metadata is not None else {},
+                ),
+                (
+                    {
+                        "configurable": {
+                            "thread_id": thread_id,
+                            "checkpoint_ns": checkpoint_ns,
+                            "checkpoint_id": parent_checkpoint_id,
+                        }
+                    }
+                    if parent_checkpoint_id
+                    else None
+                ),
+                [
+                    (task_id, channel, self.serde.loads_typed((type, value)))
+                    for task_id, channel, type, value in checkpoint_writes
+                ],
+            )
+
+    def close(self):
+        """Close the writer and the read connections."""
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+        with self.lock:
+            self.conn.close()
+
+
+@contextmanager
+def sqlite_saver(
+    path: str = "checkpoints.sqlite",
+    *,
+    readers: int = READERS,
+    pragmas: Optional[dict[str, Any]] = None,
+    serde: Optional[SerializerProtocol] = None,
+) -> Iterator[PooledSqliteSaver]:
+    """Open a pooled SQLite checkpointer, closing its connections on exit.
+
+    Args:
+        path: Path of the database file.
+        readers: Most read connections open at the same time.
+        pragmas: Pragmas of the connections, `PRAGMAS` by default.
+        serde: Serializer of the checkpoints.
+    """
+    saver = PooledSqliteSaver(path, readers=readers, pragmas=pragmas, serde=serde)
+    try:
+        yield saver
+    finally:
+        saver.close()
+
+
+@asynccontextmanager
+async def async_sqlite_saver(
+    path: str = "checkpoints.sqlite",
+    *,
+    pragmas: Optional[dict[str, Any]] = None,
+    serde: Optional[SerializerProtocol] = None,
+) -> AsyncIterator[Any]:
+    """Open an `AsyncSqliteSaver` with the same pragmas, for async graphs.
+
+    aiosqlite runs the queries of its connection in a thread of its own, so
+    the event loop isn't blocked by the disk.
+
+    Args:
+        path: Path of the database file.
+        pragmas: Pragmas of the connection, `PRAGMAS` by default.
+        serde: Serializer of the checkpoints.
+    """
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    async with aiosqlite.connect(path, timeout=BUSY_TIMEOUT_MS / 1000) as conn:
+        for name, value in (PRAGMAS if pragmas is None else pragmas).items():
+            await conn.execute(f"PRAGMA {name}={value}")
+        yield AsyncSqliteSaver(conn, serde=serde)
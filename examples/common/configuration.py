@@ -0,0 +1,59 @@
+"""Base class for configurations read from the `configurable` of a RunnableConfig."""
+
+import functools
+import os
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, ConfigDict
+
+# Most distinct configurations kept per process
+MAX_CACHED_CONFIGURATIONS = 256
+
+
+@functools.cache
+def _environment(cls: type) -> tuple[tuple[str, str | None], ...]:
+    """Read the (field, environment variable) pairs of a configuration class once."""
+    return tuple((name, os.environ.get(name.upper())) for name in cls.model_fields)
+
+
+@functools.lru_cache(maxsize=MAX_CACHED_CONFIGURATIONS)
+def _resolve(cls: type, values: tuple[tuple[str, Any], ...]):
+    """Validate a configuration, shared by every call with the same values."""
+    return cls(**{name: value for name, value in values if value is not None})
+
+
+class RunnableConfiguration(BaseModel):
+    """Configuration resolved from environment variables and the configurable.
+
+    An environment variable named like a field in upper case wins over the
+    `configurable` value. Resolved configurations are frozen and shared by
+    every call with the same values, since nodes resolve them on every run.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    @classmethod
+    def from_runnable_config(cls, config: Optional[RunnableConfig] = None):
+        """Create a configuration instance from a RunnableConfig.
+
+        The environment is read on the first call, see `clear_cache`.
+        """
+        configurable = config.get("configurable", {}) if config else {}
+        # Only the fields are part of the key: thread ids change every run
+        values = tuple(
+            (name, configurable.get(name) if value is None else value)
+            for name, value in _environment(cls)
+        )
+        try:
+            hash(values)
+        except TypeError:
+            # Unhashable configurable values can't be cached
+            return _resolve.__wrapped__(cls, values)
+        return _resolve(cls, values)
+
+    @staticmethod
+    def clear_cache():
+        """Forget the resolved configurations and read the environment again."""
+        _environment.cache_clear()
+        _resolve.cache_clear()
@@ -0,0 +1,31 @@
+"""Module attributes built on first access."""
+
+from typing import Any, Callable
+
+
+def lazy_attributes(module_globals: dict[str, Any], **factories: Callable[[], Any]):
+    """Create a module `__getattr__` building attributes on first access.
+
+    The built value is stored in the module, so the factory runs once and
+    later accesses are plain attribute lookups.
+
+    Example:
+        __getattr__ = lazy_attributes(globals(), graph=build_graph)
+
+    Args:
+        module_globals: The `globals()` of the module.
+        **factories: Functions building each attribute.
+
+    Returns:
+        The `__getattr__` function to assign in the module.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name in factories:
+            module_globals[name] = factories[name]()
+            return module_globals[name]
+        raise AttributeError(
+            f"module {module_globals['__name__']!r} has no attribute {name!r}"
+        )
+
+    return __getattr__
@@ -0,0 +1,272 @@
+"""Chat models shared by the examples, created on first use."""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence
+
+DEFAULT_MODEL = "google_genai:gemini-2.5-flash-lite"
+
+# Most chat models kept alive at the same time
+MAX_CACHED_MODELS = 16
+
+# Most models with tools or structured output kept at the same time
+MAX_CACHED_BINDINGS = 64
+
+
+def _init_chat_model(model: str, **params: Any):
+    """Create a chat model.
+
+    `langchain.chat_models` and the provider package are only imported here,
+    so importing a graph module stays cheap until a node actually calls a model.
+    """
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model(model=model, **params)
+
+
+class ChatModelRegistry:
+    """Process-wide LRU cache of chat models keyed by model name and parameters.
+
+    Reusing a model reuses its client and connection pool, instead of paying
+    the client setup and TLS handshakes on every request. Lookups are safe
+    from several threads and from async code, and concurrent first requests
+    for the same model create it only once.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MAX_CACHED_MODELS,
+        factory: Callable[..., Any] = _init_chat_model,
+    ):
+        """Initialize the registry.
+
+        Args:
+            max_size: Most models kept, the least recently used is dropped first.
+            factory: Function creating a model from its name and parameters.
+        """
+        self.max_size = max_size
+        self.factory = factory
+        self.hits = 0
+        self.misses = 0
+        self.binding_hits = 0
+        self.binding_misses = 0
+
+        self._models: OrderedDict[Hashable, Any] = OrderedDict()
+        # (model key, binding) -> (chat model, runnable built from it)
+        self._bindings: OrderedDict[Hashable, tuple[Any, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per model being created, so other models are not blocked
+        self._creating: dict[Hashable, threading.Lock] = {}
+
+    @staticmethod
+    def _key(model: str, params: dict[str, Any]) -> Hashable:
+        """Key of a model in the registry."""
+        return (model, json.dumps(params, sort_keys=True, default=repr) if params else "")
+
+    def get(self, model: str = DEFAULT_MODEL, **params: Any):
+        """Get the chat model for a model name and parameters, creating it if needed.
+
+        Args:
+            model: Model name in `provider:model` format, as for `init_chat_model`.
+            **params: Parameters of the model, such as `temperature`.
+
+        Returns:
+            The chat model, shared by every caller asking for the same model.
+        """
+        key = self._key(model, params)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+            creating = self._creating.setdefault(key, threading.Lock())
+
+        with creating:
+            with self._lock:
+                # Created by another thread while waiting
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key]
+
+            try:
+                chat_model = self.factory(model, **params)
+            finally:
+                # Also when the model can't be created, such as with a wrong
+                # name, or every failing key would keep its lock
+                with self._lock:
+                    self._creating.pop(key, None)
+
+            with self._lock:
+                self.misses += 1
+                self._models[key] = chat_model
+                while len(self._models) > self.max_size:
+                    self._models.popitem(last=False)
+
+        return chat_model
+
+    async def aget(self, model: str = DEFAULT_MODEL, **params: Any):
+        """Async version of `get`, creating missing models off the event loop.
+
+        Creating a model imports its provider package and sets up its client,
+        which would block every other coroutine of the event loop meanwhile.
+        Models are created by `get`, which also cleans up after failures.
+        """
+        key = self._key(model, params)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+        return await asyncio.to_thread(self.get, model, **params)
+
+    def bind(
+        self,
+        binding: Hashable,
+        build: Callable[[Any], Any],
+        model: str = DEFAULT_MODEL,
+        **params: Any,
+    ):
+        """Get a runnable built from a chat model, building it once.
+
+        Binding tools or a structured output converts the schemas to JSON
+        schemas and creates the output parsers, which is wasted work when it
+        is repeated on every call of a node.
+
+        Args:
+            binding: Key of the runnable among the ones built from the same model.
+            build: Function building the runnable from the chat model.
+            model: Model name in `provider:model` format, as for `init_chat_model`.
+            **params: Parameters of the model, such as `temperature`.
+
+        Returns:
+            The runnable, shared by every caller asking for the same binding.
+        """
+        chat_model = self.get(model, **params)
+        key = (self._key(model, params), binding)
+
+        with self._lock:
+            cached = self._bindings.get(key)
+            # A model dropped from the registry and created again is bound again
+            if cached is not None and cached[0] is chat_model:
+                self._bindings.move_to_end(key)
+                self.binding_hits += 1
+                return cached[1]
+
+        # Two threads may both build it, the results are equivalent
+        runnable = build(chat_model)
+
+        with self._lock:
+            self.binding_misses += 1
+            self._bindings[key] = (chat_model, runnable)
+            while len(self._bindings) > MAX_CACHED_BINDINGS:
+                self._bindings.popitem(last=False)
+
+        return runnable
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._models.clear()
+            self._bindings.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached models."""
+        return len(self._models)
+
+
+chat_models = ChatModelRegistry()
+
+
+def get_chat_model(model: str = DEFAULT_MODEL, **params: Any):
+    """Get a chat model from the process-wide registry.
+
+    Args:
+        model: Model name in `provider:model` format, as for `init_chat_model`.
+        **params: Parameters of the model, such as `temperature`.
+
+    Returns:
+        The chat model, shared by every caller asking for the same model.
+    """
+    return chat_models.get(model, **params)
+
+
+async def aget_chat_model(model: str = DEFAULT_MODEL, **params: Any):
+    """Async version of `get_chat_model`, see `ChatModelRegistry.aget`."""
+    return await chat_models.aget(model, **params)
+
+
+class _Identity:
+    """Hashable reference to an unhashable object, such as a tool, compared by identity.
+
+    Holding the object keeps its id from being reused while the key is cached.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+
+def _binding_key(method: str, schemas: Sequence[Any], kwargs: dict[str, Any]) -> Hashable:
+    """Key of a binding, schemas given as dicts are compared by value."""
+    keys = []
+    for schema in schemas:
+        if isinstance(schema, dict):
+            keys.append(json.dumps(schema, sort_keys=True, default=repr))
+        elif getattr(type(schema), "__hash__", None) is None:
+            keys.append(_Identity(schema))
+        else:
+            keys.append(schema)
+    return (
+        method,
+        tuple(keys),
+        json.dumps(kwargs, sort_keys=True, default=repr) if kwargs else "",
+    )
+
+
+def get_model_with_tools(tools: Sequence[Any], model: str = DEFAULT_MODEL, **kwargs: Any):
+    """Get a chat model from the registry with tools bound, built once.
+
+    Args:
+        tools: Tools to bind, as accepted by `bind_tools`.
+        model: Model name in `provider:model` format, as for `init_chat_model`.
+        **kwargs: Other arguments of `bind_tools`, such as `tool_choice`.
+
+    Returns:
+        The model with the tools bound, shared by every caller binding the same tools.
+    """
+    tools = list(tools)
+    return chat_models.bind(
+        _binding_key("bind_tools", tools, kwargs),
+        lambda chat_model: chat_model.bind_tools(tools, **kwargs),
+        model,
+    )
+
+
+def get_model_with_structured_output(schema: Any, model: str = DEFAULT_MODEL, **kwargs: Any):
+    """Get a chat model from the registry with a structured output, built once.
+
+    Args:
+        schema: Output schema, as accepted by `with_structured_output`.
+        model: Model name in `provider:model` format, as for `init_chat_model`.
+        **kwargs: Other arguments of `with_structured_output`, such as `method`.
+
+    Returns:
+        The runnable returning the structured output, shared by every caller
+        asking for the same schema.
+    """
+    return chat_models.bind(
+        _binding_key("with_structured_output", [schema], kwargs),
+        lambda chat_model: chat_model.with_structured_output(schema, **kwargs),
+        model,
+    )
@@ -0,0 +1,42 @@
+"""Message helpers shared by the examples."""
+
+import uuid
+
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessageChunk,
+    RemoveMessage,
+    convert_to_messages,
+    message_chunk_to_message,
+)
+from langgraph.graph import add_messages
+from langgraph.graph.message import Messages
+
+
+def append_messages(left: Messages, right: Messages) -> list[AnyMessage]:
+    """Reducer appending new messages to the history.
+
+    Gives the same result as `add_messages`, but only converts and indexes
+    the new messages: `add_messages` converts the whole history on every
+    update, which makes long threads quadratic. Removals and updates of
+    messages already in the history still go through `add_messages`.
+    """
+    if not isinstance(right, list):
+        right = [right]
+    right = [
+        message_chunk_to_message(message) if isinstance(message, BaseMessageChunk) else message
+        for message in convert_to_messages(right)
+    ]
+    for message in right:
+        if message.id is None:
+            message.id = str(uuid.uuid4())
+
+    if not isinstance(left, list) or any(
+        isinstance(message, RemoveMessage) for message in right
+    ):
+        return add_messages(left, right)
+
+    new_ids = {message.id for message in right}
+    if len(new_ids) < len(right) or any(message.id in new_ids for message in left):
+        return add_messages(left, right)
+    return left + right
@@ -0,0 +1,201 @@
+"""Trimming of the message history sent to a chat model.
+
+Chatbots sending `state["messages"]` to the model send a longer prompt on
+every turn, so latency and cost grow for as long as the thread lives. With
+trimming enabled, the model gets the system messages and the most recent
+turns fitting in a token budget. The tokens are estimated locally with
+`count_tokens_approximately`, so no tokenizer or network access is needed.
+The dropped turns can also be folded into a running summary, sent after the
+system messages.
+
+The history in the state is left untouched: only the prompt is trimmed.
+
+Example:
+    class State(TrimmingState):
+        messages: Annotated[list, add_messages]
+
+    def chatbot(state: State, config: RunnableConfig):
+        prompt, update = trimmed_prompt(state, config, get_llm())
+        return {"messages": [get_llm().invoke(prompt)], **update}
+"""
+
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from pydantic import Field
+from typing_extensions import TypedDict
+
+from examples.common.configuration import RunnableConfiguration
+
+summary_instructions = """
+You are a helpful assistant that keeps a summary of a conversation.
+
+This is the summary of the conversation so far:
+<Summary>
+{summary}
+</Summary>
+
+These are the next messages of the conversation:
+<Messages>
+{messages}
+</Messages>
+
+Update the summary with these messages. Keep what is still relevant from the summary so far, and answer only with the updated summary.
+"""
+
+summary_message = "Summary of the earlier conversation:\n{summary}"
+
+
+class TrimmingConfiguration(RunnableConfiguration):
+    """Configurable trimming of the prompt of a chatbot."""
+
+    trim_history: bool = Field(
+        default=False,
+        description="Send only the most recent turns fitting in max_prompt_tokens instead of the whole history",
+    )
+    max_prompt_tokens: int = Field(
+        default=4000,
+        description="Estimated tokens of the prompt, system messages and summary included",
+    )
+    max_turns: Optional[int] = Field(
+        default=None,
+        description="Most user turns sent, None to only limit the tokens",
+    )
+    summarize_trimmed: bool = Field(
+        default=False,
+        description="Fold the turns left out of the prompt into a running summary",
+    )
+    summary_interval: int = Field(
+        default=8,
+        description="Messages folded into the summary at once, so it isn't updated on every turn",
+    )
+
+
+class TrimmingState(TypedDict, total=False):
+    """State keys of the summary of the trimmed turns."""
+
+    summary: str
+    summarized_message_count: int
+
+
+def system_prefix(messages: Sequence[BaseMessage]) -> int:
+    """Number of system messages at the start of the history."""
+    count = 0
+    while count < len(messages) and isinstance(messages[count], SystemMessage):
+        count += 1
+    return count
+
+
+def turn_start(messages: Sequence[BaseMessage], index: int, end: int) -> int:
+    """Index of the first user message from `index`, `end` if there is none."""
+    while index < end and not isinstance(messages[index], HumanMessage):
+        index += 1
+    return index
+
+
+def recent_start(
+    messages: Sequence[BaseMessage],
+    start: int,
+    max_tokens: int,
+    max_turns: Optional[int] = None,
+) -> int:
+    """Index of the first message of the most recent turns fitting in a budget.
+
+    Only the kept messages are counted, walking back from the last one, so
+    the cost doesn't grow with the history. The kept messages start on a
+    user message, so tool results are never sent without their tool call.
+    The last turn is kept even if it doesn't fit.
+
+    Args:
+        messages: History of the conversation.
+        start: First message that can be kept.
+        max_tokens: Estimated tokens of the kept messages.
+        max_turns: Most user turns kept, None for no limit.
+    """
+    tokens = 0
+    turns = 0
+    index = len(messages)
+    while index > start:
+        message = messages[index - 1]
+        tokens += count_tokens_approximately([message])
+        if tokens > max_tokens:
+            break
+        if isinstance(message, HumanMessage):
+            turns += 1
+        index -= 1
+        if max_turns is not None and turns >= max_turns:
+            break
+
+    first = turn_start(messages, index, len(messages))
+    if first == len(messages):
+        # Not even the last turn fits, keep it anyway
+        for first in range(len(messages) - 1, start - 1, -1):
+            if isinstance(messages[first], HumanMessage):
+                return first
+        return max(start, len(messages) - 1)
+    return first
+
+
+def summarize(llm, summary: str, messages: Sequence[BaseMessage]) -> str:
+    """Fold messages into a running summary."""
+    prompt = summary_instructions.format(
+        summary=summary or "No summary yet.",
+        messages=get_buffer_string(messages),
+    )
+    return llm.invoke(prompt).content
+
+
+def trimmed_prompt(
+    state: dict[str, Any], config: Optional[RunnableConfig] = None, llm=None
+) -> tuple[list[BaseMessage], dict[str, Any]]:
+    """Build the prompt of a chatbot from its state, trimmed if enabled.
+
+    Args:
+        state: State with the `messages`, and the keys of `TrimmingState`
+            when summarizing.
+        config: Config of the run, read with `TrimmingConfiguration`.
+        llm: Chat model writing the summary, needed with `summarize_trimmed`.
+
+    Returns:
+        The messages to send to the model, and the update of the state with
+        the new summary, empty if the summary didn't change.
+    """
+    messages = state["messages"]
+    configuration = TrimmingConfiguration.from_runnable_config(config)
+    if not configuration.trim_history:
+        return list(messages), {}
+
+    system_count = system_prefix(messages)
+    system = list(messages[:system_count])
+    budget = configuration.max_prompt_tokens - count_tokens_approximately(system)
+    if not configuration.summarize_trimmed:
+        start = recent_start(messages, system_count, budget, configuration.max_turns)
+        return system + list(messages[start:]), {}
+
+    summary = state.get("summary", "")
+    summarized = max(state.get("summarized_message_count", 0), system_count)
+    update = {}
+    if summary:
+        budget -= count_tokens_approximately([summary_message.format(summary=summary)])
+    start = recent_start(messages, summarized, budget, configuration.max_turns)
+    if start > summarized:
+        # Fold a few more messages than needed, so the summary isn't updated
+        # again on the next turns
+        end = turn_start(messages, start + configuration.summary_interval, len(messages))
+        if end == len(messages):
+            end = start
+        summary = summarize(llm, summary, messages[summarized:end])
+        summarized = end
+        update = {"summary": summary, "summarized_message_count": summarized}
+
+    prompt = system
+    if summary:
+        prompt.append(SystemMessage(content=summary_message.format(summary=summary)))
+    return prompt + list(messages[summarized:]), update
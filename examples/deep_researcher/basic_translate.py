@@ -1,6 +1,5 @@
 from typing import Annotated, Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     BaseMessage,
     get_buffer_string,
@@ -8,6 +7,9 @@ from langchain_core.messages import (
 from langgraph.graph import END, START, MessagesState, StateGraph, add_messages
 from langgraph.types import Command
 
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import get_chat_model
+
 
 class TranslateInputState(MessagesState):
     """Input state containing only messages."""
@@ -43,9 +45,6 @@ Take a look at the feedback made by the user and improve the translation. Follow
 {translation_instructions}
 """
 
-llm = init_chat_model(model="google_genai:gemini-2.5-flash-lite")
-
-
 def translate(state: TranslateState) -> Command[Literal["__end__"]]:
     """Translate the messages to the user."""
     translate_iterations = state.get("translate_iterations", 0)
@@ -64,7 +63,7 @@ def translate(state: TranslateState) -> Command[Literal["__end__"]]:
             translation_instructions=translation_instructions,
         )
 
-    response = llm.invoke(prompt)
+    response = get_chat_model().invoke(prompt)
 
     return Command(
         goto=END,
@@ -76,10 +75,16 @@ def translate(state: TranslateState) -> Command[Literal["__end__"]]:
     )
 
 
-graph = StateGraph(TranslateState, input_schema=TranslateInputState)
+def build_graph():
+    """Build the basic translate graph."""
+    graph = StateGraph(TranslateState, input_schema=TranslateInputState)
+
+    graph.add_node("translate", translate)
+
+    graph.add_edge(START, "translate")
 
-graph.add_node("translate", translate)
+    return graph.compile()
 
-graph.add_edge(START, "translate")
 
-graph = graph.compile()
+# Built on first access, so importing this module stays cheap
+__getattr__ = lazy_attributes(globals(), graph=build_graph)
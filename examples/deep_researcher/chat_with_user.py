@@ -1,23 +1,46 @@
 from typing import Annotated, Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
     SystemMessage,
     get_buffer_string,
 )
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, MessagesState, StateGraph, add_messages
 from langgraph.graph.state import BaseModel
 from langgraph.types import Command
 from pydantic import Field
 
+from examples.common.configuration import RunnableConfiguration
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import get_chat_model, get_model_with_structured_output
+
 
 class AgentState(MessagesState):
     """Main agent state containing messages."""
 
     messages: Annotated[list[BaseMessage], add_messages]
     summary: str
+    # Number of messages, from the start, already folded into the summary
+    summarized_message_count: int
+
+
+class ChatWithUserConfiguration(RunnableConfiguration):
+    """Configurable settings of the chat with user graph."""
+
+    incremental_summary: bool = Field(
+        default=True,
+        description="Keep a running summary of the older messages instead of sending the whole history on every turn",
+    )
+    message_window: int = Field(
+        default=12,
+        description="Most recent messages always sent as they are, in incremental summary mode",
+    )
+    summary_interval: int = Field(
+        default=8,
+        description="Messages gathered beyond the window before they are folded into the summary",
+    )
 
 
 class InputState(MessagesState):
@@ -62,16 +85,87 @@ If you do not need to create a summary of the conversation, return:
 For the answer when no summary is needed:
 - Keep the message concise and professional
 """
-llm = init_chat_model(model="google_genai:gemini-2.5-flash-lite")
 
+earlier_summary_instructions = """
+This is a summary of the earlier messages of the conversation:
+<Summary>
+{summary}
+</Summary>
+"""
 
-def chat_with_user(state: AgentState) -> Command[Literal["create_summary", "__end__"]]:
-    """Chat with the user."""
-    llm_with_structured_output = llm.with_structured_output(ChatWithUserResponse)
+update_summary_instructions = """
+You are a helpful assistant that keeps a summary of the conversation with the user.
+
+This is the summary of the conversation so far:
+<Summary>
+{summary}
+</Summary>
+
+These are the new messages of the conversation:
+<Messages>
+{messages}
+</Messages>
+
+Update the summary with the new messages. Keep what is still relevant from the summary so far, and answer only with the updated summary.
+"""
+
+
+def unsummarized_messages(state: AgentState) -> list[BaseMessage]:
+    """Messages not folded into the summary yet."""
+    return state["messages"][state.get("summarized_message_count", 0) :]
 
-    prompt_content = chat_with_user_instructions.format(
-        messages=get_buffer_string(state["messages"]),
+
+def summarize(summary: str, messages: list[BaseMessage]) -> str:
+    """Fold new messages into a summary, without sending the summarized ones again."""
+    prompt = update_summary_instructions.format(
+        summary=summary or "No summary yet.",
+        messages=get_buffer_string(messages),
     )
+    return get_chat_model().invoke(prompt).content
+
+
+def route_start(state: AgentState, config: RunnableConfig) -> str:
+    """Update the summary first when too many messages are outside of it."""
+    configuration = ChatWithUserConfiguration.from_runnable_config(config)
+    if configuration.incremental_summary and len(unsummarized_messages(state)) > (
+        configuration.message_window + configuration.summary_interval
+    ):
+        return "update_summary"
+    return "chat_with_user"
+
+
+def update_summary(state: AgentState, config: RunnableConfig):
+    """Fold the messages older than the window into the running summary."""
+    configuration = ChatWithUserConfiguration.from_runnable_config(config)
+    summarized = state.get("summarized_message_count", 0)
+    folded = unsummarized_messages(state)[: -configuration.message_window or None]
+    return {
+        "summary": summarize(state.get("summary", ""), folded),
+        "summarized_message_count": summarized + len(folded),
+    }
+
+
+def chat_with_user(
+    state: AgentState, config: RunnableConfig
+) -> Command[Literal["create_summary", "__end__"]]:
+    """Chat with the user."""
+    configuration = ChatWithUserConfiguration.from_runnable_config(config)
+    llm_with_structured_output = get_model_with_structured_output(ChatWithUserResponse)
+
+    if configuration.incremental_summary:
+        # The summary stands for the older messages, see update_summary
+        prompt_content = chat_with_user_instructions.format(
+            messages=get_buffer_string(unsummarized_messages(state)),
+        )
+        if state.get("summary"):
+            prompt_content = (
+                earlier_summary_instructions.format(summary=state["summary"])
+                + prompt_content
+            )
+    else:
+        prompt_content = chat_with_user_instructions.format(
+            messages=get_buffer_string(state["messages"]),
+        )
 
     response = llm_with_structured_output.invoke(prompt_content)
 
@@ -86,23 +180,48 @@ def chat_with_user(state: AgentState) -> Command[Literal["create_summary", "__en
         )
 
 
-def create_summary(state: AgentState) -> Command[Literal["__end__"]]:
+def create_summary(
+    state: AgentState, config: RunnableConfig
+) -> Command[Literal["__end__"]]:
     """Generate a final report based on the user's messages."""
+    configuration = ChatWithUserConfiguration.from_runnable_config(config)
+    if configuration.incremental_summary:
+        # Fold the same messages as update_summary, the recent ones are still
+        # sent as they are on the next turns
+        summarized = state.get("summarized_message_count", 0)
+        folded = unsummarized_messages(state)[: -configuration.message_window or None]
+        return Command(
+            goto=END,
+            update={
+                "summary": summarize(state.get("summary", ""), folded),
+                "summarized_message_count": summarized + len(folded),
+            },
+        )
+
     system_prompt = SystemMessage(
         content="""
     You are a helpful assistant that generates a summary of the user's messages.
     """
     )
-    response = llm.invoke([system_prompt] + state["messages"])
+    response = get_chat_model().invoke([system_prompt] + state["messages"])
     return Command(goto=END, update={"summary": response.content})
 
 
-graph_builder = StateGraph(AgentState, input_schema=InputState)
+def build_graph():
+    """Build the chat with user graph."""
+    graph_builder = StateGraph(AgentState, input_schema=InputState)
 
-graph_builder.add_node("chat_with_user", chat_with_user)
-graph_builder.add_node("create_summary", create_summary)
+    graph_builder.add_node("update_summary", update_summary)
+    graph_builder.add_node("chat_with_user", chat_with_user)
+    graph_builder.add_node("create_summary", create_summary)
+
+    graph_builder.add_conditional_edges(
+        START, route_start, ["update_summary", "chat_with_user"]
+    )
+    graph_builder.add_edge("update_summary", "chat_with_user")
 
-graph_builder.add_edge(START, "chat_with_user")
+    return graph_builder.compile()
 
 
-graph = graph_builder.compile()
+# Built on first access, so importing this module stays cheap
+__getattr__ = lazy_attributes(globals(), graph=build_graph)
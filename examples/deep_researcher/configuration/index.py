@@ -1,38 +1,31 @@
-import os
-from typing import Annotated, Any, Optional
+from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 from typing_extensions import TypedDict
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
 
+from examples.common.configuration import RunnableConfiguration
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import get_chat_model
+
 load_dotenv()
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
 
-class Configuration(BaseModel):
+class Configuration(RunnableConfiguration):
     llm_model: str = Field(
         default="google_genai:gemini-2.5-flash-lite",
         description="Model to use for the LLM",
     )
 
-    @classmethod
-    def from_runnable_config(
-        cls, config: Optional[RunnableConfig] = None
-    ) -> "Configuration":
-        """Create a Configuration instance from a RunnableConfig."""
-        configurable = config.get("configurable", {}) if config else {}
-        field_names = list(cls.model_fields.keys())
-        values: dict[str, Any] = {
-            field_name: os.environ.get(field_name.upper(), configurable.get(field_name))
-            for field_name in field_names
-        }
-        return cls(**{k: v for k, v in values.items() if v is not None})
+    def chat_model(self):
+        """Get the chat model of this configuration, reused across requests."""
+        return get_chat_model(self.llm_model)
     
 
 # Initialize the LLM
@@ -40,20 +33,26 @@ class Configuration(BaseModel):
 
 # Define the chatbot node
 def chatbot(state: State, config: RunnableConfig):
-    model = Configuration.from_runnable_config(config).llm_model
-    print(model)
-    llm = init_chat_model(model)
+    configuration = Configuration.from_runnable_config(config)
+    print(configuration.llm_model)
+    llm = configuration.chat_model()
     return {"messages": [llm.invoke(state["messages"])]}
 
 # Build the graph
-graph_builder = StateGraph(State)
-graph_builder.add_node("chatbot", chatbot)
-graph_builder.add_edge(START, "chatbot")
-graph_builder.add_edge("chatbot", END)
+def build_graph():
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_edge(START, "chatbot")
+    graph_builder.add_edge("chatbot", END)
+
+    return graph_builder.compile()
 
-graph = graph_builder.compile()
+
+__getattr__ = lazy_attributes(globals(), graph=build_graph)
 
 def main():
+    graph = build_graph()
+
 # Stream the updates of the chatbot
     def stream_graph_updates(user_input: str):
         events = graph.stream(
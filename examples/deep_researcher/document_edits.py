@@ -0,0 +1,215 @@
+"""Targeted edits and partial views of a text document.
+
+Lets an agent change a long document with line ranges, search and replace,
+or unified diffs, and see only a window of it plus an outline, instead of
+reading and writing the whole document on every turn. Lines are numbered
+from 1, and every edit returns the new document with the first line it
+changed, so the view can follow the edits.
+"""
+
+import re
+
+# Lines of the document shown to the model at once
+VIEW_LINES = 80
+
+# Most entries of an outline
+OUTLINE_ITEMS = 40
+
+HEADING = re.compile(r"^#{1,6}\s+\S")
+HUNK_HEADER = re.compile(r"^@@(?: -(\d+)(?:,\d+)? \+\d+(?:,\d+)?)? @@")
+
+
+class PatchError(ValueError):
+    """Edit that doesn't apply to the document."""
+
+
+def split_lines(document: str) -> list[str]:
+    """Split a document into lines, without the empty one after a final newline."""
+    lines = document.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def join_lines(lines: list[str], document: str) -> str:
+    """Join edited lines, keeping the final newline of the original document."""
+    text = "\n".join(lines)
+    if lines and (document.endswith("\n") or not document):
+        text += "\n"
+    return text
+
+
+def replace_lines(document: str, start: int, end: int, content: str) -> tuple[str, int]:
+    """Replace lines `start` to `end`, both included, with new content.
+
+    Args:
+        document: Document to edit.
+        start: First line to replace.
+        end: Last line to replace, `start - 1` to insert before `start`.
+        content: New lines, empty to delete the lines.
+
+    Returns:
+        The new document and the first line changed.
+    """
+    lines = split_lines(document)
+    if not 1 <= start <= len(lines) + 1 or not start - 1 <= end <= len(lines):
+        raise PatchError(
+            f"Lines {start}-{end} are outside of the document, which has {len(lines)} lines."
+        )
+
+    new_lines = split_lines(content) if content else []
+    return join_lines(lines[: start - 1] + new_lines + lines[end:], document), start
+
+
+def replace_text(
+    document: str, search: str, replace: str, replace_all: bool = False
+) -> tuple[str, int]:
+    """Replace an exact piece of text.
+
+    Args:
+        document: Document to edit.
+        search: Text to replace, found exactly once unless `replace_all`.
+        replace: Replacement text.
+        replace_all: Replace every occurrence instead.
+
+    Returns:
+        The new document and the first line changed.
+    """
+    if not search:
+        raise PatchError("The text to replace is empty.")
+    count = document.count(search)
+    if count == 0:
+        raise PatchError("The text to replace was not found in the document.")
+    if count > 1 and not replace_all:
+        raise PatchError(
+            f"The text to replace was found {count} times, include more context to make it unique."
+        )
+
+    line = document.count("\n", 0, document.index(search)) + 1
+    return document.replace(search, replace), line
+
+
+def parse_hunks(diff: str) -> list[tuple[int | None, list[str], list[str]]]:
+    """Parse the hunks of a unified diff.
+
+    Returns:
+        A (start line or None when the header has no numbers, old lines, new
+        lines) tuple per hunk.
+    """
+    hunks = []
+    for line in diff.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            start = int(header.group(1)) if header.group(1) else None
+            hunks.append((start, [], []))
+        elif not hunks:
+            # File headers, "---" and "+++" lines before the first hunk
+            continue
+        elif line.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        elif line.startswith("-"):
+            hunks[-1][1].append(line[1:])
+        elif line.startswith("+"):
+            hunks[-1][2].append(line[1:])
+        elif line.startswith(" ") or not line:
+            # Context line, some models drop the leading space of empty lines
+            hunks[-1][1].append(line[1:])
+            hunks[-1][2].append(line[1:])
+        else:
+            raise PatchError(
+                f"Line {line!r} of hunk {len(hunks)} doesn't start with ' ', '-' or '+'."
+            )
+    return hunks
+
+
+def find_block(lines: list[str], block: list[str], expected: int) -> int | None:
+    """Index where a block of lines starts, the closest to the expected one."""
+    matches = [
+        index
+        for index in range(len(lines) - len(block) + 1)
+        if lines[index : index + len(block)] == block
+    ]
+    if not matches:
+        return None
+    return min(matches, key=lambda index: abs(index - expected))
+
+
+def apply_unified_diff(document: str, diff: str) -> tuple[str, int]:
+    """Apply a unified diff.
+
+    Hunks are found by their context, the closest to their line number, so
+    diffs with slightly wrong or missing line numbers still apply.
+
+    Returns:
+        The new document and the first line changed.
+    """
+    hunks = parse_hunks(diff)
+    if not hunks:
+        raise PatchError("The diff has no hunks, they start with '@@'.")
+
+    lines = split_lines(document)
+    first_line = None
+    # Line numbers refer to the original document: they move by the lines
+    # added or removed by the previous hunks, and by how far they were off
+    offset = 0
+    # Hunks without line numbers are looked for after the previous hunk
+    position = 0
+    for number, (start, old_lines, new_lines) in enumerate(hunks, start=1):
+        if old_lines:
+            expected = start - 1 + offset if start is not None else position
+            index = find_block(lines, old_lines, expected)
+            if index is None:
+                raise PatchError(
+                    f"Hunk {number} doesn't match the document, check its context and removed lines."
+                )
+        else:
+            # Only added lines, inserted after the line in the header
+            index = min(max(start + offset if start is not None else position, 0), len(lines))
+
+        lines[index : index + len(old_lines)] = new_lines
+        if start is not None:
+            offset = index - (start - 1 if old_lines else start) + len(new_lines) - len(old_lines)
+        position = index + len(new_lines)
+        first_line = index + 1 if first_line is None else min(first_line, index + 1)
+
+    return join_lines(lines, document), first_line
+
+
+def outline(document: str, max_items: int = OUTLINE_ITEMS) -> str:
+    """Outline of a document with line numbers.
+
+    Lists the markdown headings, or the first line of every paragraph when
+    there are none.
+    """
+    lines = split_lines(document)
+    entries = [(number, line) for number, line in enumerate(lines, start=1) if HEADING.match(line)]
+    if not entries:
+        entries = [
+            (number, line)
+            for number, line in enumerate(lines, start=1)
+            if line.strip() and (number == 1 or not lines[number - 2].strip())
+        ]
+
+    items = [
+        f"{number:>5}| {line if len(line) <= 80 else line[:77] + '...'}"
+        for number, line in entries[:max_items]
+    ]
+    if len(entries) > max_items:
+        items.append(f"  ... {len(entries) - max_items} more")
+    return "\n".join(items)
+
+
+def view(document: str, start: int = 1, size: int = VIEW_LINES) -> tuple[str, int, int]:
+    """Numbered window of the lines of a document.
+
+    Returns:
+        The numbered lines and the first and last line shown.
+    """
+    lines = split_lines(document)
+    start = min(max(start, 1), max(len(lines) - size + 1, 1))
+    end = min(start + size - 1, len(lines))
+    numbered = "\n".join(
+        f"{number:>5}| {lines[number - 1]}" for number in range(start, end + 1)
+    )
+    return numbered, start, end
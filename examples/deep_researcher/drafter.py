@@ -1,119 +1,435 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from pathlib import Path
 from typing import Annotated, Sequence, TypedDict
 
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
+    AIMessage,
     BaseMessage,
     HumanMessage,
     SystemMessage,
     ToolMessage,
+    trim_messages,
 )
-from langchain_core.tools import tool
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import InjectedToolCallId, StructuredTool, tool
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, StateGraph
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt import InjectedState, ToolNode
+from langgraph.types import Command
+
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import aget_chat_model, get_model_with_tools
+from examples.common.messages import append_messages
+from examples.deep_researcher import document_edits
 
 load_dotenv()
 
-# This is the global variable to store document content
-document_content = ""
+# Most tokens of history sent to the model, the oldest messages are left out first
+MAX_CONTEXT_TOKENS = 8000
+
+# Most recent messages considered for the context, so long sessions aren't scanned whole
+MAX_CONTEXT_MESSAGES = 200
 
 
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Only appended to, so add_messages doesn't go through the history every step
+    messages: Annotated[Sequence[BaseMessage], append_messages]
+    # Document being drafted in this thread
+    document: str
+    # First line of the document shown to the model
+    view_start: int
+    # Index of the last user message, always sent to the model
+    instruction_index: int
+    # Whether the document was saved, which ends the session
+    saved: bool
+
+
+def edited(document: str, line: int, message: str, tool_call_id: str) -> Command:
+    """Store the edited document and move the view to the edited lines."""
+    return Command(
+        update={
+            "document": document,
+            "view_start": max(line - document_edits.VIEW_LINES // 4, 1),
+            "messages": [ToolMessage(content=message, tool_call_id=tool_call_id)],
+        }
+    )
+
+
+def edit_failed(error: Exception, tool_call_id: str) -> Command:
+    """Tell the model why an edit didn't apply, leaving the document unchanged."""
+    return Command(
+        update={
+            "messages": [
+                ToolMessage(
+                    content=f"Error editing the document: {error}",
+                    tool_call_id=tool_call_id,
+                    status="error",
+                )
+            ],
+        }
+    )
 
 
 @tool
-def update(content: str) -> str:
-    """Updates the document with the provided content."""
-    global document_content
-    document_content = content
-    return f"Document has been updated successfully! The current content is:\n{document_content}"
+def update(content: str, tool_call_id: Annotated[str, InjectedToolCallId]) -> Command:
+    """Replace the whole document with new content.
+
+    Only use it to write a new document, change an existing one with the edit tools.
+    """
+    lines = len(document_edits.split_lines(content))
+    return edited(
+        content, 1, f"Document has been updated successfully! It has {lines} lines.", tool_call_id
+    )
 
 
 @tool
-def save(filename: str) -> str:
-    """Save the current document to a text file and finish the process.
+def replace_text(
+    search: str,
+    replace: str,
+    document: Annotated[str, InjectedState("document")],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    replace_all: bool = False,
+) -> Command:
+    """Replace an exact piece of text of the document.
 
     Args:
-        filename: Name for the text file.
+        search: Exact text to replace, including enough context to be unique.
+        replace: Text replacing it.
+        replace_all: Replace every occurrence instead of a unique one.
+    """
+    try:
+        document, line = document_edits.replace_text(document, search, replace, replace_all)
+    except document_edits.PatchError as e:
+        return edit_failed(e, tool_call_id)
+    return edited(document, line, f"Replaced the text at line {line}.", tool_call_id)
+
+
+@tool
+def replace_lines(
+    start_line: int,
+    end_line: int,
+    content: str,
+    document: Annotated[str, InjectedState("document")],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command:
+    """Replace a range of lines of the document.
+
+    Args:
+        start_line: First line to replace, numbered from 1.
+        end_line: Last line to replace, included. Use start_line - 1 to insert before start_line.
+        content: New lines, empty to delete the lines.
     """
-    global document_content
+    try:
+        document, line = document_edits.replace_lines(document, start_line, end_line, content)
+    except document_edits.PatchError as e:
+        return edit_failed(e, tool_call_id)
+    return edited(document, line, f"Replaced lines {start_line}-{end_line}.", tool_call_id)
 
-    if not filename.endswith(".txt"):
-        filename = f"{filename}.txt"
 
+@tool
+def apply_diff(
+    diff: str,
+    document: Annotated[str, InjectedState("document")],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command:
+    """Apply a unified diff to the document.
+
+    Args:
+        diff: Unified diff with '@@' hunks, context lines start with a space.
+    """
     try:
-        with open(filename, "w") as file:
-            file.write(document_content)
-        print(f"\n💾 Document has been saved to: {filename}")
-        return f"Document has been saved successfully to '{filename}'."
+        document, line = document_edits.apply_unified_diff(document, diff)
+    except document_edits.PatchError as e:
+        return edit_failed(e, tool_call_id)
+    return edited(document, line, f"Applied the diff from line {line}.", tool_call_id)
+
+
+@tool
+def view_document(
+    start_line: int, tool_call_id: Annotated[str, InjectedToolCallId]
+) -> Command:
+    """Show other lines of the document.
 
-    except Exception as e:
+    Args:
+        start_line: First line to show, numbered from 1.
+    """
+    return Command(
+        update={
+            "view_start": max(start_line, 1),
+            "messages": [
+                ToolMessage(
+                    content=f"The document is now shown from line {start_line}.",
+                    tool_call_id=tool_call_id,
+                )
+            ],
+        }
+    )
+
+
+def document_path(filename: str) -> Path:
+    """Path where a document is saved, in DRAFTER_OUTPUT_DIR or the working directory.
+
+    Only the base name of the file name chosen by the model is used, so the
+    documents of every user stay in the output directory.
+    """
+    name = os.path.basename(filename.replace("\\", "/"))
+    if name in ("", ".", ".."):
+        raise ValueError(f"Invalid file name '{filename}'")
+    if not name.endswith(".txt"):
+        name = f"{name}.txt"
+    return Path(os.environ.get("DRAFTER_OUTPUT_DIR", ".")) / name
+
+
+def write_document(path: Path, document: str):
+    """Write a document to a temporary file that then replaces the file.
+
+    Readers see either the previous or the new document, never a partial one.
+    """
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        with open(fd, "w", encoding="utf-8") as file:
+            file.write(document)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        temp_path = None
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def save_document(
+    filename: str,
+    document: Annotated[str, InjectedState("document")],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command | str:
+    """Save the current document to a text file and finish the process.
+
+    Args:
+        filename: Name for the text file.
+    """
+    try:
+        path = document_path(filename)
+        write_document(path, document)
+    except (OSError, ValueError) as e:
         return f"Error saving document: {str(e)}"
 
+    print(f"\n💾 Document has been saved to: {path}")
+    return Command(
+        update={
+            "saved": True,
+            "messages": [
+                ToolMessage(
+                    content=f"Document has been saved successfully to '{path.name}'.",
+                    tool_call_id=tool_call_id,
+                )
+            ],
+        }
+    )
+
 
-tools = [update, save]
+async def asave_document(
+    filename: str,
+    document: Annotated[str, InjectedState("document")],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command | str:
+    """Save the current document to a text file and finish the process.
 
-model = init_chat_model(model="google_genai:gemini-2.5-flash-lite").bind_tools(tools)
+    Args:
+        filename: Name for the text file.
+    """
+    # Disk writes would block every other thread served by the event loop
+    return await asyncio.to_thread(save_document, filename, document, tool_call_id)
 
 
-def our_agent(state: AgentState) -> AgentState:
+save = StructuredTool.from_function(
+    func=save_document, coroutine=asave_document, name="save"
+)
+
+
+tools = [update, replace_text, replace_lines, apply_diff, view_document, save]
+
+tool_node = ToolNode(tools)
+
+
+def get_model():
+    """Get the chat model with the document tools bound, created on first use."""
+    return get_model_with_tools(tools)
+
+
+def document_context(state: AgentState) -> str:
+    """Outline and visible lines of the document, instead of the whole document."""
+    document = state.get("document", "")
+    if not document:
+        return "The document is empty."
+
+    numbered, start, end = document_edits.view(document, state.get("view_start", 1))
+    return f"""The document has {len(document_edits.split_lines(document))} lines.
+
+Outline:
+{document_edits.outline(document)}
+
+Lines {start}-{end}:
+{numbered}"""
+
+
+def context_messages(
+    messages: Sequence[BaseMessage], instruction_index: int
+) -> list[BaseMessage]:
+    """Messages sent to the model: the last user message and the recent ones that fit.
+
+    Older messages are left out once the history goes over MAX_CONTEXT_TOKENS,
+    so the prompt stops growing in long sessions.
+    """
+    instruction = messages[instruction_index]
+    start = max(instruction_index + 1, len(messages) - MAX_CONTEXT_MESSAGES)
+    recent = trim_messages(
+        messages[start:],
+        max_tokens=MAX_CONTEXT_TOKENS - count_tokens_approximately([instruction]),
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        # Tool results are never sent without the tool calls they answer
+        start_on="ai",
+    )
+    return [instruction] + recent
+
+
+def agent_prompt(state: AgentState) -> tuple[list[BaseMessage], list[BaseMessage], int]:
+    """Build the prompt of the agent.
+
+    Returns:
+        The prompt, the messages to add to the history and the index of the
+        last user message.
+    """
     system_prompt = SystemMessage(
         content=f"""
     You are Drafter, a helpful writing assistant. You are going to help the user update and modify documents.
     
-    - If the user wants to update or modify content, use the 'update' tool with the complete updated content.
+    - If the user wants a new document, use the 'update' tool with the complete content.
+    - If the user wants to modify content, edit only the lines that change: use 'replace_text' for a piece of text, 'replace_lines' for a range of lines, or 'apply_diff' with a unified diff. Never send the whole document again.
+    - You only see part of the document, use 'view_document' to see other lines.
     - If the user wants to save and finish, you need to use the 'save' tool.
-    - Make sure to always show the current document state after modifications.
+    - After modifications, briefly tell the user what changed.
     
-    The current document content is:{document_content}
+    {document_context(state)}
     """
     )
 
     print(f"MESSAGES: {len(state['messages'])}")
 
-    if not state["messages"]:
+    messages = state["messages"]
+    new_messages = []
+    instruction_index = state.get("instruction_index", 0)
+    if not messages:
         user_input = (
             "I'm ready to help you update a document. What would you like to create?"
         )
         user_message = HumanMessage(content=user_input)
+        messages = new_messages = [user_message]
+        instruction_index = 0
 
-    else:
+    elif isinstance(messages[-1], HumanMessage):
         # user_input = input("\nWhat would you like to do with the document? ")
         # print(f"\n👤 USER: {user_input}")
         # user_message = HumanMessage(content=user_input)
-        messages = state["messages"]
         user_message = messages[-1]
         print(f"\n👤 USER: {user_message}")
+        instruction_index = len(messages) - 1
 
-    all_messages = [system_prompt] + list(state["messages"]) + [user_message]
+    all_messages = [system_prompt] + context_messages(messages, instruction_index)
+    return all_messages, new_messages, instruction_index
 
-    response = model.invoke(all_messages)
 
+def agent_result(
+    response: BaseMessage, new_messages: list[BaseMessage], instruction_index: int
+) -> dict:
+    """State update with the answer of the model."""
     print(f"\n🤖 AI: {response.content}")
     if hasattr(response, "tool_calls") and response.tool_calls:
         print(f"🔧 USING TOOLS: {[tc['name'] for tc in response.tool_calls]}")
 
-    return {"messages": list(state["messages"]) + [user_message, response]}
+    # Only the new messages, append_messages adds them to the history
+    return {
+        "messages": new_messages + [response],
+        "instruction_index": instruction_index,
+    }
+
+
+def our_agent(state: AgentState) -> AgentState:
+    all_messages, new_messages, instruction_index = agent_prompt(state)
+    response = get_model().invoke(all_messages)
+    return agent_result(response, new_messages, instruction_index)
+
+
+async def aour_agent(state: AgentState) -> AgentState:
+    """Async version of `our_agent`."""
+    all_messages, new_messages, instruction_index = agent_prompt(state)
+    # Create the model off the event loop, the tools binding is cached
+    await aget_chat_model()
+    response = await get_model().ainvoke(all_messages)
+    return agent_result(response, new_messages, instruction_index)
+
+
+def tool_values(state: AgentState) -> dict:
+    """State values the tools read and update."""
+    return {
+        "document": state.get("document", ""),
+        "view_start": state.get("view_start", 1),
+        # Only set again when the document is saved in this step
+        "saved": False,
+    }
+
+
+def tool_input(tool_call: dict, values: dict) -> dict:
+    """Input of ToolNode running a single tool call."""
+    return {"messages": [AIMessage(content="", tool_calls=[tool_call])], **values}
+
+
+def apply_tool_output(output, values: dict, messages: list):
+    """Add the updates of a tool call to the state values and the new messages."""
+    for result in output if isinstance(output, list) else [output]:
+        update = dict(result.update if isinstance(result, Command) else result)
+        messages.extend(update.pop("messages", []))
+        values.update(update)
+
+
+def run_tools(state: AgentState) -> dict:
+    """Run the tool calls of the last message one after the other.
+
+    ToolNode runs the calls of a message in parallel on the same state, so
+    two edits in a message would conflict. Here every edit applies to the
+    document left by the previous one.
+    """
+    values = tool_values(state)
+    messages = []
+    for tool_call in state["messages"][-1].tool_calls:
+        apply_tool_output(tool_node.invoke(tool_input(tool_call, values)), values, messages)
+
+    return {**values, "messages": messages}
+
+
+async def arun_tools(state: AgentState) -> dict:
+    """Async version of `run_tools`, saving the document off the event loop."""
+    values = tool_values(state)
+    messages = []
+    for tool_call in state["messages"][-1].tool_calls:
+        output = await tool_node.ainvoke(tool_input(tool_call, values))
+        apply_tool_output(output, values, messages)
+
+    return {**values, "messages": messages}
 
 
 def should_continue(state: AgentState) -> str:
     """Determine if we should continue or end the conversation."""
-    messages = state["messages"]
-
-    if not messages:
-        return "continue"
-
-    # This looks for the most recent tool message....
-    for message in reversed(messages):
-        # ... and checks if this is a ToolMessage resulting from save
-        if (
-            isinstance(message, ToolMessage)
-            and "saved" in message.content.lower()
-            and "document" in message.content.lower()
-        ):
-            return "end"  # goes to the end edge which leads to the endpoint
+    # Set by the save tool, instead of looking for its message in the history
+    if state.get("saved"):
+        return "end"  # goes to the end edge which leads to the endpoint
 
     return "continue"
 
@@ -128,34 +444,46 @@ def print_messages(messages):
             print(f"\n🛠️ TOOL RESULT: {message.content}")
 
 
-graph = StateGraph(AgentState)
+def build_graph(checkpointer=None):
+    """Build the drafter graph.
 
-graph.add_node("agent", our_agent)
-graph.add_node("tools", ToolNode(tools))
+    Args:
+        checkpointer: Saves the document and messages of every thread, so one
+            process can serve several users. `langgraph dev` provides its own.
+    """
+    graph = StateGraph(AgentState)
 
-graph.set_entry_point("agent")
+    graph.add_node("agent", RunnableLambda(our_agent, aour_agent))
+    graph.add_node("tools", RunnableLambda(run_tools, arun_tools))
 
-graph.add_edge("agent", "tools")
+    graph.set_entry_point("agent")
 
+    graph.add_edge("agent", "tools")
+
+    graph.add_conditional_edges(
+        "tools",
+        should_continue,
+        {
+            "continue": "agent",
+            "end": END,
+        },
+    )
+
+    return graph.compile(checkpointer=checkpointer)
 
-graph.add_conditional_edges(
-    "tools",
-    should_continue,
-    {
-        "continue": "agent",
-        "end": END,
-    },
-)
 
-app = graph.compile()
+# Built on first access, so importing this module stays cheap
+__getattr__ = lazy_attributes(globals(), app=build_graph)
 
 
 def run_document_agent():
     print("\n ===== DRAFTER =====")
 
-    state = {"messages": []}
+    app = build_graph(checkpointer=InMemorySaver())
+    state = {"messages": [], "document": ""}
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
 
-    for step in app.stream(state, stream_mode="values"):
+    for step in app.stream(state, config, stream_mode="values"):
         if "messages" in step:
             print_messages(step["messages"])
 
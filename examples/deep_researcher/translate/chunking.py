@@ -0,0 +1,99 @@
+"""Split long texts into chunks that can be translated independently."""
+
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def _split_keeping_separators(text: str, pattern: re.Pattern) -> list[str]:
+    """Split the text after every separator, keeping it at the end of the piece."""
+    pieces = []
+    start = 0
+    for separator in pattern.finditer(text):
+        if separator.end() > start and separator.start() > start:
+            pieces.append(text[start : separator.end()])
+            start = separator.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_piece(piece: str, max_chars: int) -> list[str]:
+    """Split a piece longer than max_chars on the finest boundary needed."""
+    for pattern in (SENTENCE_END, WHITESPACE):
+        parts = _split_keeping_separators(piece, pattern)
+        if len(parts) > 1:
+            return [
+                part
+                for sub_piece in parts
+                for part in (
+                    _split_piece(sub_piece, max_chars)
+                    if len(sub_piece) > max_chars
+                    else [sub_piece]
+                )
+            ]
+    # A single word longer than a chunk: cut it
+    return [piece[i : i + max_chars] for i in range(0, len(piece), max_chars)]
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Split a text into paragraphs, keeping the blank lines after each one."""
+    return _split_keeping_separators(text, PARAGRAPH_BREAK)
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split a text into chunks of at most max_chars on paragraph or sentence ends.
+
+    Paragraphs are kept together when they fit, otherwise they are split into
+    sentences, then words. Consecutive pieces are packed into the same chunk
+    while it stays under max_chars. The separators stay in the chunks, so
+    joining the chunks gives back the original text.
+
+    Args:
+        text: Text to split.
+        max_chars: Maximum length of a chunk. 0 or less disables splitting.
+
+    Returns:
+        List of chunks, in text order.
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) > max_chars:
+            pieces.extend(_split_piece(paragraph, max_chars))
+        else:
+            pieces.append(paragraph)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_whitespace(chunk: str) -> tuple[str, str, str]:
+    """Split a chunk into its leading whitespace, content and trailing whitespace."""
+    content = chunk.strip()
+    if not content:
+        return chunk, "", ""
+    leading = chunk[: len(chunk) - len(chunk.lstrip())]
+    trailing = chunk[len(chunk.rstrip()) :]
+    return leading, content, trailing
+
+
+def paragraph_contents(text: str) -> list[str]:
+    """Get the non-empty paragraphs of a text without their surrounding whitespace."""
+    return [
+        content
+        for content in (split_whitespace(paragraph)[1] for paragraph in split_paragraphs(text))
+        if content
+    ]
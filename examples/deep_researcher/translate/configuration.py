@@ -0,0 +1,26 @@
+"""Configuration of the translate graph."""
+
+from pydantic import Field
+
+from examples.common.configuration import RunnableConfiguration
+
+
+class TranslateConfiguration(RunnableConfiguration):
+    """Configurable settings of the translate graph."""
+
+    chunk_size: int = Field(
+        default=4000,
+        description="Maximum characters per translated chunk, 0 to translate the whole text at once",
+    )
+    max_concurrency: int = Field(
+        default=8,
+        description="Maximum number of chunks translated at the same time",
+    )
+    use_translation_memory: bool = Field(
+        default=True,
+        description="Reuse approved translations of paragraphs seen before",
+    )
+    translation_memory_threshold: float = Field(
+        default=101,
+        description="Minimum similarity (0-100) to reuse a remembered paragraph as its translation, above 100 for exact matches only. Fuzzy matches are reused verbatim, so a lower value can keep the translation of a different sentence",
+    )
@@ -1,12 +1,29 @@
 """Glossary management module for handling JSON-based glossary storage."""
 
 import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Tuple
+
+from examples.deep_researcher.translate.match_words import GlossaryMatcher
+from examples.deep_researcher.translate.search_index import GlossarySearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
 
 
 class GlossaryManager:
-    """Manages glossary operations with JSON file storage."""
+    """Manages glossary operations with JSON file storage.
+
+    Writes replace the file atomically under an advisory lock, so concurrent
+    workers never lose each other's edits nor leave a truncated file behind.
+    """
 
     def __init__(self, glossary_path: str = None):
         """Initialize the glossary manager.
@@ -19,23 +36,44 @@ class GlossaryManager:
             self.glossary_path = Path(__file__).parent / "glossary.json"
         else:
             self.glossary_path = Path(glossary_path)
+        self.lock_path = self.glossary_path.with_name(self.glossary_path.name + ".lock")
 
         self._glossary_cache = None
+        # (inode, size, mtime) of the file the cache was read from
+        self._cache_signature = None
+        self._matcher = None
+        self._search_index = None
+        # Glossary the search index reflects
+        self._search_index_glossary = None
+
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        # Pending glossary while inside `batch()`
+        self._batch = None
 
     def load_glossary(self) -> Dict[str, Dict[str, str]]:
         """Load glossary from JSON file.
 
+        The parsed glossary is cached and only read again when the file changes
+        on disk, also when another process rewrote it. The returned dictionary
+        is shared between calls, so it must not be modified.
+
         Returns:
             Dictionary containing the glossary sources.
         """
-        if not self.glossary_path.exists():
+        signature = self._file_signature()
+        if signature is None:
             # Create empty glossary if file doesn't exist
             self._create_empty_glossary()
             return {}
 
+        if self._glossary_cache is not None and signature == self._cache_signature:
+            return self._glossary_cache
+
         try:
             with open(self.glossary_path, encoding="utf-8") as f:
                 self._glossary_cache = json.load(f)
+                self._cache_signature = signature
                 return self._glossary_cache
         except (OSError, json.JSONDecodeError) as e:
             print(f"Error loading glossary from {self.glossary_path}: {e}")
@@ -44,25 +82,69 @@ class GlossaryManager:
     def save_glossary(self, glossary: Dict[str, Dict[str, str]]) -> bool:
         """Save glossary to JSON file.
 
+        The glossary is written to a temporary file that then replaces the
+        glossary file, so readers see either the old or the new glossary.
+
         Args:
             glossary: Dictionary containing the glossary sources.
 
         Returns:
             True if saved successfully, False otherwise.
         """
+        temp_path = None
         try:
-            # Ensure directory exists
-            self.glossary_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(self.glossary_path, "w", encoding="utf-8") as f:
-                json.dump(glossary, f, indent=2, ensure_ascii=False)
-
-            # Update cache
-            self._glossary_cache = glossary.copy()
+            with self._locked():
+                fd, temp_path = tempfile.mkstemp(
+                    dir=self.glossary_path.parent,
+                    prefix=f".{self.glossary_path.name}.",
+                    suffix=".tmp",
+                )
+                with open(fd, "w", encoding="utf-8") as f:
+                    json.dump(glossary, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(temp_path, self._file_mode())
+                os.replace(temp_path, self.glossary_path)
+                temp_path = None
+
+                # Update cache
+                self._glossary_cache = glossary.copy()
+                self._cache_signature = self._file_signature()
             return True
         except OSError as e:
             print(f"Error saving glossary to {self.glossary_path}: {e}")
             return False
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @contextmanager
+    def batch(self):
+        """Apply several edits with a single load and a single write.
+
+        Edits made inside the block through this manager are written when the
+        block exits, and discarded if it raises. Other writers wait until then.
+        Raises OSError if the glossary can't be written, so a failed batch
+        isn't mistaken for a saved one.
+
+        Example:
+            with manager.batch():
+                manager.add_source("tree", "árbol")
+                manager.remove_source("bush")
+        """
+        with self._locked():
+            if self._batch is not None:
+                # Nested batch: the outermost one writes
+                yield self
+                return
+
+            self._batch = self.load_glossary().copy()
+            try:
+                yield self
+                if not self.save_glossary(self._batch):
+                    raise OSError(f"Error saving the glossary batch to {self.glossary_path}")
+            finally:
+                self._batch = None
 
     def add_source(self, source: str, target: str, note: str = "") -> bool:
         """Add or update a source in the glossary.
@@ -75,11 +157,24 @@ class GlossaryManager:
         Returns:
             True if added successfully, False otherwise.
         """
-        glossary = self.load_glossary()
+        return self.add_sources([(source, target, note)])
 
-        glossary[source.lower()] = {"target": target, "note": note}
+    def add_sources(self, sources: Iterable[Tuple[str, str, str]]) -> bool:
+        """Add or update several sources with a single write.
 
-        return self.save_glossary(glossary)
+        Args:
+            sources: (source, target, note) tuples.
+
+        Returns:
+            True if added successfully, False otherwise.
+        """
+        with self._locked():
+            glossary = self._working_glossary()
+
+            for source, target, note in sources:
+                glossary[source.lower()] = {"target": target, "note": note}
+
+            return self._commit(glossary)
 
     def remove_source(self, source: str) -> bool:
         """Remove a source from the glossary.
@@ -90,14 +185,15 @@ class GlossaryManager:
         Returns:
             True if removed successfully, False if source not found or error occurred.
         """
-        glossary = self.load_glossary()
+        with self._locked():
+            glossary = self._working_glossary()
 
-        source_lower = source.lower()
-        if source_lower not in glossary:
-            return False
+            source_lower = source.lower()
+            if source_lower not in glossary:
+                return False
 
-        del glossary[source_lower]
-        return self.save_glossary(glossary)
+            del glossary[source_lower]
+            return self._commit(glossary)
 
     def get_source(self, source: str) -> Dict[str, str] | None:
         """Get a specific source from the glossary.
@@ -122,19 +218,22 @@ class GlossaryManager:
         Returns:
             True if updated successfully, False if source not found or error occurred.
         """
-        glossary = self.load_glossary()
+        with self._locked():
+            glossary = self._working_glossary()
 
-        source_lower = source.lower()
-        if source_lower not in glossary:
-            return False
+            source_lower = source.lower()
+            if source_lower not in glossary:
+                return False
 
-        if target is not None:
-            glossary[source_lower]["target"] = target
+            glossary[source_lower] = glossary[source_lower].copy()
 
-        if note is not None:
-            glossary[source_lower]["note"] = note
+            if target is not None:
+                glossary[source_lower]["target"] = target
 
-        return self.save_glossary(glossary)
+            if note is not None:
+                glossary[source_lower]["note"] = note
+
+            return self._commit(glossary)
 
     def get_all_sources(self) -> Dict[str, Dict[str, str]]:
         """Get all sources from the glossary.
@@ -145,34 +244,110 @@ class GlossaryManager:
         return self.load_glossary()
 
     def search_sources(
-        self, search_text: str, search_in_notes: bool = True
+        self,
+        search_text: str,
+        search_in_notes: bool = True,
+        prefix: bool = False,
+        rank: bool = False,
     ) -> Dict[str, Dict[str, str]]:
         """Search for sources containing the search text.
 
+        Searches are answered from an index that is built on the first search
+        and then only updated with the entries that changed. The index is
+        updated in place, so concurrent searches take turns using it.
+
         Args:
             search_text: Text to search for.
             search_in_notes: Whether to also search in notes.
+            prefix: Only match at the start of a word.
+            rank: Order the results by match quality instead of glossary order.
 
         Returns:
             Dictionary of matching sources.
         """
         glossary = self.load_glossary()
-        matches = {}
-        search_lower = search_text.lower()
+        with self._thread_lock:
+            if self._search_index is None:
+                self._search_index = GlossarySearchIndex(glossary)
+            elif self._search_index_glossary is not glossary:
+                self._search_index.update(self._search_index_glossary, glossary)
+            self._search_index_glossary = glossary
+
+            return self._search_index.search(search_text, search_in_notes, prefix, rank)
+
+    def get_matcher(self, threshold: int = 80) -> GlossaryMatcher:
+        """Get a matcher for the current glossary.
 
-        for source, data in glossary.items():
-            if (
-                search_lower in source.lower()
-                or search_lower in data["target"].lower()
-                or (search_in_notes and search_lower in data["note"].lower())
-            ):
-                matches[source] = data
+        The matcher is reused until the glossary changes.
+
+        Args:
+            threshold: Similarity threshold (0-100).
 
-        return matches
+        Returns:
+            GlossaryMatcher over the glossary sources.
+        """
+        glossary = self.load_glossary()
+        if (
+            self._matcher is None
+            or self._matcher.glossary is not glossary
+            or self._matcher.threshold != threshold
+        ):
+            self._matcher = GlossaryMatcher(glossary, threshold)
+        return self._matcher
+
+    @contextmanager
+    def _locked(self):
+        """Hold the glossary lock, shared by the threads and processes writing it."""
+        with self._thread_lock:
+            self._lock_depth += 1
+            lock_file = None
+            try:
+                if self._lock_depth == 1:
+                    # Ensure directory exists
+                    self.glossary_path.parent.mkdir(parents=True, exist_ok=True)
+                    lock_file = open(self.lock_path, "a")
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                if lock_file is not None:
+                    # Closing the file releases the lock
+                    lock_file.close()
+                self._lock_depth -= 1
+
+    def _working_glossary(self) -> Dict[str, Dict[str, str]]:
+        """Get the glossary to edit: the pending batch or a copy of the file."""
+        if self._batch is not None:
+            return self._batch
+        return self.load_glossary().copy()
+
+    def _commit(self, glossary: Dict[str, Dict[str, str]]) -> bool:
+        """Save an edited glossary, unless it is written at the end of a batch."""
+        if glossary is self._batch:
+            return True
+        return self.save_glossary(glossary)
+
+    def _file_signature(self) -> Tuple[int, int, int] | None:
+        """Get the (inode, size, mtime) of the glossary file, or None if missing."""
+        try:
+            file_stat = self.glossary_path.stat()
+        except FileNotFoundError:
+            return None
+        return (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+    def _file_mode(self) -> int:
+        """Get the permissions to give the glossary file, keeping the current ones."""
+        try:
+            return stat.S_IMODE(self.glossary_path.stat().st_mode)
+        except FileNotFoundError:
+            return 0o644
 
     def _create_empty_glossary(self):
         """Create an empty glossary file."""
-        self.save_glossary({})
+        with self._locked():
+            # Another process may have created it while waiting for the lock
+            if self._file_signature() is None:
+                self.save_glossary({})
 
 
 # Convenience functions for backward compatibility
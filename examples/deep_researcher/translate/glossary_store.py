@@ -0,0 +1,402 @@
+"""Glossary storage backed by SQLite with indexed lookups."""
+
+import argparse
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from examples.deep_researcher.translate.glossary_manager import GlossaryManager
+from examples.deep_researcher.translate.match_words import GlossaryMatcher
+from examples.deep_researcher.translate.search_index import entry_matches, match_rank
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS glossary (
+    source TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    note TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS glossary_fts USING fts5(
+    source, target, note, content='glossary', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS glossary_ai AFTER INSERT ON glossary BEGIN
+    INSERT INTO glossary_fts(rowid, source, target, note)
+    VALUES (new.rowid, new.source, new.target, new.note);
+END;
+CREATE TRIGGER IF NOT EXISTS glossary_ad AFTER DELETE ON glossary BEGIN
+    INSERT INTO glossary_fts(glossary_fts, rowid, source, target, note)
+    VALUES ('delete', old.rowid, old.source, old.target, old.note);
+END;
+CREATE TRIGGER IF NOT EXISTS glossary_au AFTER UPDATE ON glossary BEGIN
+    INSERT INTO glossary_fts(glossary_fts, rowid, source, target, note)
+    VALUES ('delete', old.rowid, old.source, old.target, old.note);
+    INSERT INTO glossary_fts(rowid, source, target, note)
+    VALUES (new.rowid, new.source, new.target, new.note);
+END;
+"""
+
+UPSERT_SOURCE = """
+INSERT INTO glossary (source, target, note) VALUES (?, ?, ?)
+ON CONFLICT (source) DO UPDATE SET target = excluded.target, note = excluded.note
+"""
+
+# The trigram tokenizer can only look up search texts of at least 3 characters
+MIN_FTS_QUERY_LENGTH = 3
+
+
+class SqliteGlossaryStore:
+    """Manages glossary operations with SQLite storage.
+
+    Exposes the same API as `GlossaryManager`, but every edit is a single row
+    write and searches use a trigram full-text index over source, target and
+    note instead of scanning the whole glossary.
+    """
+
+    def __init__(self, db_path: str = None):
+        """Initialize the glossary store.
+
+        Args:
+            db_path: Path to the SQLite database. If None, uses default path.
+        """
+        if db_path is None:
+            # Default to glossary.sqlite in the same directory as this file
+            self.db_path = Path(__file__).parent / "glossary.sqlite"
+        else:
+            self.db_path = Path(db_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        # Writes inside `batch()` are committed when the outermost batch exits
+        self._batch_depth = 0
+        with self._cursor() as cur:
+            cur.executescript(SCHEMA)
+
+        self._glossary_cache = None
+        # PRAGMA data_version changes whenever another connection commits
+        self._cache_version = None
+        self._matcher = None
+
+    @contextmanager
+    def _cursor(self):
+        """Get a cursor, committing on success and rolling back on error."""
+        with self._lock:
+            cur = self._conn.cursor()
+            try:
+                yield cur
+                if not self._batch_depth:
+                    self._conn.commit()
+            except BaseException:
+                if not self._batch_depth:
+                    self._conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    @contextmanager
+    def batch(self):
+        """Apply several edits in a single transaction.
+
+        Edits made inside the block through this store are committed when the
+        block exits, and rolled back if it raises. A failed edit raises its
+        `sqlite3.Error` instead of returning False, so the whole batch is
+        rolled back.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._conn.rollback()
+                    self._glossary_cache = None
+                raise
+            else:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._conn.commit()
+
+    def _write(self, query: str, params: tuple = ()) -> int:
+        """Execute a write query and return the number of rows it changed."""
+        try:
+            with self._cursor() as cur:
+                cur.execute(query, params)
+                changed = cur.rowcount
+        except sqlite3.Error as e:
+            if self._batch_depth:
+                # Roll the whole batch back, not only this edit
+                raise
+            print(f"Error writing glossary to {self.db_path}: {e}")
+            return -1
+
+        self._glossary_cache = None
+        return changed
+
+    def load_glossary(self) -> Dict[str, Dict[str, str]]:
+        """Load the whole glossary.
+
+        The glossary is cached until this store or another connection writes
+        to the database. The returned dictionary is shared between calls, so it
+        must not be modified.
+
+        Returns:
+            Dictionary containing the glossary sources.
+        """
+        with self._cursor() as cur:
+            version = cur.execute("PRAGMA data_version").fetchone()[0]
+            if self._glossary_cache is not None and version == self._cache_version:
+                return self._glossary_cache
+
+            rows = cur.execute(
+                "SELECT source, target, note FROM glossary ORDER BY rowid"
+            ).fetchall()
+
+        self._glossary_cache = {
+            source: {"target": target, "note": note} for source, target, note in rows
+        }
+        self._cache_version = version
+        return self._glossary_cache
+
+    def save_glossary(self, glossary: Dict[str, Dict[str, str]]) -> bool:
+        """Replace the whole glossary.
+
+        Args:
+            glossary: Dictionary containing the glossary sources.
+
+        Returns:
+            True if saved successfully, False otherwise.
+        """
+        try:
+            with self._cursor() as cur:
+                cur.execute("DELETE FROM glossary")
+                cur.executemany(
+                    "INSERT INTO glossary (source, target, note) VALUES (?, ?, ?)",
+                    [
+                        (source, data["target"], data.get("note", ""))
+                        for source, data in glossary.items()
+                    ],
+                )
+        except sqlite3.Error as e:
+            if self._batch_depth:
+                raise
+            print(f"Error saving glossary to {self.db_path}: {e}")
+            return False
+
+        self._glossary_cache = None
+        return True
+
+    def add_source(self, source: str, target: str, note: str = "") -> bool:
+        """Add or update a source in the glossary.
+
+        Args:
+            source: The English source to translate.
+            target: The translation target.
+            note: Optional note about when to use this translation.
+
+        Returns:
+            True if added successfully, False otherwise.
+        """
+        return self._write(UPSERT_SOURCE, (source.lower(), target, note)) > 0
+
+    def add_sources(self, sources: Iterable[Tuple[str, str, str]]) -> bool:
+        """Add or update several sources in a single transaction.
+
+        Args:
+            sources: (source, target, note) tuples.
+
+        Returns:
+            True if added successfully, False otherwise.
+        """
+        try:
+            with self._cursor() as cur:
+                cur.executemany(
+                    UPSERT_SOURCE,
+                    [(source.lower(), target, note) for source, target, note in sources],
+                )
+        except sqlite3.Error as e:
+            if self._batch_depth:
+                raise
+            print(f"Error writing glossary to {self.db_path}: {e}")
+            return False
+
+        self._glossary_cache = None
+        return True
+
+    def remove_source(self, source: str) -> bool:
+        """Remove a source from the glossary.
+
+        Args:
+            source: The source to remove.
+
+        Returns:
+            True if removed successfully, False if source not found or error occurred.
+        """
+        return (
+            self._write("DELETE FROM glossary WHERE source = ?", (source.lower(),))
+            > 0
+        )
+
+    def get_source(self, source: str) -> Dict[str, str] | None:
+        """Get a specific source from the glossary.
+
+        Args:
+            source: The source to look up.
+
+        Returns:
+            Dictionary with 'target' and 'note' keys, or None if not found.
+        """
+        with self._cursor() as cur:
+            row = cur.execute(
+                "SELECT target, note FROM glossary WHERE source = ?",
+                (source.lower(),),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {"target": row[0], "note": row[1]}
+
+    def update_source(self, source: str, target: str = None, note: str = None) -> bool:
+        """Update an existing source in the glossary.
+
+        Args:
+            source: The source to update.
+            target: New translation target (optional).
+            note: New note (optional).
+
+        Returns:
+            True if updated successfully, False if source not found or error occurred.
+        """
+        return (
+            self._write(
+                """
+                UPDATE glossary
+                SET target = COALESCE(?, target), note = COALESCE(?, note)
+                WHERE source = ?
+                """,
+                (target, note, source.lower()),
+            )
+            > 0
+        )
+
+    def get_all_sources(self) -> Dict[str, Dict[str, str]]:
+        """Get all sources from the glossary.
+
+        Returns:
+            Complete glossary dictionary.
+        """
+        return self.load_glossary()
+
+    def search_sources(
+        self,
+        search_text: str,
+        search_in_notes: bool = True,
+        prefix: bool = False,
+        rank: bool = False,
+    ) -> Dict[str, Dict[str, str]]:
+        """Search for sources containing the search text.
+
+        Args:
+            search_text: Text to search for.
+            search_in_notes: Whether to also search in notes.
+            prefix: Only match at the start of a word.
+            rank: Order the results by match quality instead of glossary order.
+
+        Returns:
+            Dictionary of matching sources.
+        """
+        search_lower = search_text.lower()
+        # The trigram tokenizer only folds the case of ASCII letters, unlike
+        # str.lower(), so it could miss matches of other texts
+        if len(search_lower) < MIN_FTS_QUERY_LENGTH or not search_lower.isascii():
+            candidates = self.load_glossary().items()
+        else:
+            columns = "{source target note}" if search_in_notes else "{source target}"
+            phrase = search_text.replace('"', '""')
+            with self._cursor() as cur:
+                rows = cur.execute(
+                    """
+                    SELECT source, target, note FROM glossary
+                    WHERE rowid IN (SELECT rowid FROM glossary_fts WHERE glossary_fts MATCH ?)
+                    ORDER BY rowid
+                    """,
+                    (f'{columns}: "{phrase}"',),
+                ).fetchall()
+            candidates = [
+                (source, {"target": target, "note": note})
+                for source, target, note in rows
+            ]
+
+        # Check the candidates with the same case folding as GlossaryManager
+        matches = [
+            (source, data)
+            for source, data in candidates
+            if entry_matches(search_lower, source, data, search_in_notes, prefix)
+        ]
+        if rank:
+            matches.sort(key=lambda match: match_rank(search_lower, *match))
+        return dict(matches)
+
+    def get_matcher(self, threshold: int = 80) -> GlossaryMatcher:
+        """Get a matcher for the current glossary.
+
+        The matcher is reused until the glossary changes.
+
+        Args:
+            threshold: Similarity threshold (0-100).
+
+        Returns:
+            GlossaryMatcher over the glossary sources.
+        """
+        glossary = self.load_glossary()
+        if (
+            self._matcher is None
+            or self._matcher.glossary is not glossary
+            or self._matcher.threshold != threshold
+        ):
+            self._matcher = GlossaryMatcher(glossary, threshold)
+        return self._matcher
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+
+def migrate_json_glossary(json_path: str = None, db_path: str = None) -> int:
+    """Copy a JSON glossary into a SQLite glossary store.
+
+    Sources that already exist in the store are overwritten.
+
+    Args:
+        json_path: Path to the glossary JSON file. If None, uses default path.
+        db_path: Path to the SQLite database. If None, uses default path.
+
+    Returns:
+        Number of migrated sources.
+    """
+    glossary = GlossaryManager(json_path).load_glossary()
+    store = SqliteGlossaryStore(db_path)
+    try:
+        store.add_sources(
+            (source, data["target"], data.get("note", ""))
+            for source, data in glossary.items()
+        )
+    finally:
+        store.close()
+    return len(glossary)
+
+
+def main():
+    """Migrate a JSON glossary to SQLite."""
+    parser = argparse.ArgumentParser(description="Migrate glossary.json to SQLite.")
+    parser.add_argument("--json-path", default=None)
+    parser.add_argument("--db-path", default=None)
+    args = parser.parse_args()
+
+    count = migrate_json_glossary(args.json_path, args.db_path)
+    print(f"Migrated {count} sources")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
+import asyncio
+import os
 from typing import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
     get_buffer_string,
 )
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, START, StateGraph
+from langgraph.config import get_stream_writer
 from langgraph.types import Command, interrupt
 
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import aget_chat_model, get_chat_model, get_model_with_tools
+from examples.deep_researcher.translate.chunking import (
+    paragraph_contents,
+    split_paragraphs,
+    split_text,
+    split_whitespace,
+)
+from examples.deep_researcher.translate.configuration import TranslateConfiguration
 from examples.deep_researcher.translate.glossary_manager import GlossaryManager
-from examples.deep_researcher.translate.match_words import match_words_from_glossary
+from examples.deep_researcher.translate.glossary_store import SqliteGlossaryStore
 from examples.deep_researcher.translate.prompts import (
     first_translation_instructions,
     lead_update_glossary_prompt,
@@ -24,99 +36,323 @@ from examples.deep_researcher.translate.state import (
     TranslateState,
     UpdateGlossaryState,
 )
+from examples.deep_researcher.translate.translation_memory import TranslationMemory
 from examples.deep_researcher.translate.utils import format_glossary
 
-# Initialize glossary manager
-glossary_manager = GlossaryManager()
+# Supervisor answers that approve the translation instead of asking for changes
+APPROVAL_RESPONSES = {"approve", "approved", "ok", "okay", "lgtm", "looks good", "perfect"}
+
+# Created on first use by get_glossary_manager() and get_translation_memory()
+glossary_manager = None
+translation_memory = None
 
 
-llm = init_chat_model(model="google_genai:gemini-2.5-flash-lite")
+def get_glossary_manager():
+    """Get the glossary manager, stored in SQLite when GLOSSARY_DB_PATH is set."""
+    global glossary_manager
+    if glossary_manager is None:
+        if os.environ.get("GLOSSARY_DB_PATH"):
+            glossary_manager = SqliteGlossaryStore(os.environ["GLOSSARY_DB_PATH"])
+        else:
+            glossary_manager = GlossaryManager()
+    return glossary_manager
 
 
-def initial_translation(state: TranslateState) -> Command[Literal["supervisor"]]:
-    text_to_translate = state["messages"][-1].content
+def get_translation_memory() -> TranslationMemory:
+    """Get the memory of approved translations, reused for known paragraphs."""
+    global translation_memory
+    if translation_memory is None:
+        translation_memory = TranslationMemory(os.environ.get("TRANSLATION_MEMORY_PATH"))
+    return translation_memory
 
-    # Load current glossary
-    glossary_en_es = glossary_manager.load_glossary()
-    found_glossary_words = match_words_from_glossary(glossary_en_es, text_to_translate)
-    state["words_to_match"] = found_glossary_words
 
-    prompt = first_translation_instructions.format(
+def translation_prompt(text_to_translate: str, matcher) -> str:
+    """Build the translation prompt with the glossary terms found in the text."""
+    found_glossary_words = matcher.match(text_to_translate)
+    return first_translation_instructions.format(
         text_to_translate=text_to_translate,
         translation_instructions=translation_instructions.format(
             glossary=format_glossary(found_glossary_words),
         ),
     )
-    response = llm.invoke(prompt)
 
+
+def prepare_translation(
+    text_to_translate: str, configuration: TranslateConfiguration
+) -> tuple[list[tuple[str, str | None]], list[list[tuple[str, str, str]]], list[str]]:
+    """Reuse the remembered paragraphs of a text and build the prompts of the new ones.
+
+    Reads the glossary and the translation memory, so the async nodes run it
+    in a thread.
+
+    Returns:
+        The segments of the text as (text, translation or None if it has to be
+        translated), the (leading, content, trailing) chunks of every segment
+        to translate, and the prompts of the chunks with content.
+    """
+    # Match the current glossary
+    matcher = get_glossary_manager().get_matcher()
+
+    # Reuse the remembered paragraphs and group the consecutive new ones
+    segments = []
+    for paragraph in split_paragraphs(text_to_translate):
+        leading, content, trailing = split_whitespace(paragraph)
+        remembered = None
+        if configuration.use_translation_memory and content:
+            remembered = get_translation_memory().lookup(
+                content, configuration.translation_memory_threshold
+            )
+
+        if remembered is not None:
+            segments.append((paragraph, leading + remembered + trailing))
+        elif segments and segments[-1][1] is None:
+            segments[-1] = (segments[-1][0] + paragraph, None)
+        else:
+            segments.append((paragraph, None))
+
+    # Every chunk is translated with its own glossary terms
+    parts = [
+        [split_whitespace(chunk) for chunk in split_text(text, configuration.chunk_size)]
+        for text, translation in segments
+        if translation is None
+    ]
+    prompts = [
+        translation_prompt(content, matcher)
+        for text_parts in parts
+        for _, content, _ in text_parts
+        if content
+    ]
+    return segments, parts, prompts
+
+
+def assemble_translation(segments, parts, responses) -> str:
+    """Put the remembered and new translations back together with the original spacing."""
+    responses = iter(responses)
+    new_translations = iter(
+        "".join(
+            leading + (next(responses).content.strip() if content else "") + trailing
+            for leading, content, trailing in text_parts
+        )
+        for text_parts in parts
+    )
+    return "".join(
+        translation if translation is not None else next(new_translations)
+        for _, translation in segments
+    )
+
+
+def chunk_configs(configuration: TranslateConfiguration, count: int) -> list[RunnableConfig]:
+    """Configs of the model calls translating the chunks.
+
+    The chunk index is added to the metadata, so the tokens streamed by
+    `stream_mode="messages"` for concurrent chunks can be told apart.
+    """
+    return [
+        {
+            "max_concurrency": configuration.max_concurrency,
+            "metadata": {"translation_chunk": index, "translation_chunks": count},
+        }
+        for index in range(count)
+    ]
+
+
+def chunk_translated(writer, index: int, count: int, response):
+    """Send a translated chunk to `stream_mode="custom"` as soon as it is ready."""
+    writer(
+        {
+            "translation_chunk": index,
+            "translation_chunks": count,
+            "content": response.content.strip(),
+        }
+    )
+
+
+def translation_message(translation: str, responses: list) -> AIMessage:
+    """Message with the whole translation.
+
+    A translation made of a single model answer keeps the id of that answer,
+    so `stream_mode="messages"` doesn't send the text again after its tokens.
+    """
+    if len(responses) == 1 and responses[0].content.strip() == translation.strip():
+        return AIMessage(content=translation, id=responses[0].id)
+    return AIMessage(content=translation)
+
+
+def initial_translation_result(
+    text_to_translate: str, translation: str, responses: list
+) -> Command:
+    """Send the first translation to the supervisor."""
     return Command(
         goto="supervisor",
         update={
-            "messages": [AIMessage(content=response.content)],
-            "current_translation": HumanMessage(
-                content=response.content
-            ),  # TODO: REMOVE, THIS IS FOR DEBUGGING PURPOSES IN LANGGRAPH STUDIO
+            "messages": [translation_message(translation, responses)],
+            "current_translation": translation,
             "translate_iterations": 1,
             "original_text": text_to_translate,
         },
     )
 
 
+def initial_translation(
+    state: TranslateState, config: RunnableConfig
+) -> Command[Literal["supervisor"]]:
+    text_to_translate = state["messages"][-1].content
+    configuration = TranslateConfiguration.from_runnable_config(config)
+
+    segments, parts, prompts = prepare_translation(text_to_translate, configuration)
+
+    # Chunks are streamed as they are done, in any order
+    writer = get_stream_writer()
+    responses = [None] * len(prompts)
+    for index, response in get_chat_model().batch_as_completed(
+        prompts, config=chunk_configs(configuration, len(prompts))
+    ):
+        chunk_translated(writer, index, len(prompts), response)
+        responses[index] = response
+
+    translation = assemble_translation(segments, parts, responses)
+    return initial_translation_result(text_to_translate, translation, responses)
+
+
+async def ainitial_translation(
+    state: TranslateState, config: RunnableConfig
+) -> Command[Literal["supervisor"]]:
+    """Async version of `initial_translation`."""
+    text_to_translate = state["messages"][-1].content
+    configuration = TranslateConfiguration.from_runnable_config(config)
+
+    segments, parts, prompts = await asyncio.to_thread(
+        prepare_translation, text_to_translate, configuration
+    )
+    # Chunks are streamed as they are done, in any order
+    writer = get_stream_writer()
+    responses = [None] * len(prompts)
+    llm = await aget_chat_model()
+    async for index, response in llm.abatch_as_completed(
+        prompts, config=chunk_configs(configuration, len(prompts))
+    ):
+        chunk_translated(writer, index, len(prompts), response)
+        responses[index] = response
+
+    translation = assemble_translation(segments, parts, responses)
+    return initial_translation_result(text_to_translate, translation, responses)
+
+
 def supervisor(
     state: TranslateState,
-) -> Command[Literal["refine_translation"]]:
-    value = interrupt({"text_to_revise": state["messages"][-1].content})
+) -> Command[Literal["refine_translation", "store_translation"]]:
+    # The whole translation, even when it was streamed chunk by chunk
+    value = interrupt({"text_to_revise": state["current_translation"]})
     print(value)
+    approved = value.lower().strip().rstrip(".!") in APPROVAL_RESPONSES
     return Command(
-        goto="refine_translation",
+        goto="store_translation" if approved else "refine_translation",
         update={
             "messages": [HumanMessage(content=value)],
         },
     )
 
 
-def refine_translation(
-    state: TranslateState,
-) -> Command[Literal["update_glossary_subgraph"]]:
+def refine_translation_prompt(state: TranslateState) -> str:
+    """Build the prompt correcting the translation with the user feedback."""
     last_two_messages = state["messages"][-2:]
-    prompt = update_translation_instructions.format(
+    return update_translation_instructions.format(
         messages=get_buffer_string(last_two_messages),
         translation_instructions=translation_instructions.format(glossary={}),
     )
-    response = llm.invoke(prompt)
 
+
+def refine_translation_result(state: TranslateState, response) -> Command:
+    """Send the corrected translation to the glossary update."""
     return Command(
         goto="update_glossary_subgraph",
         update={
-            "messages": [AIMessage(content=response.content)],
-            "current_translation": HumanMessage(
-                content=response.content
-            ),  # TODO: REMOVE, THIS IS FOR DEBUGGING PURPOSES IN LANGGRAPH STUDIO
+            # The model answer itself, already streamed with the same id
+            "messages": [response],
+            "current_translation": response.content,
             "translate_iterations": state["translate_iterations"] + 1,
         },
     )
 
 
-def update_glossary_supervisor(
+def refine_translation(
     state: TranslateState,
+) -> Command[Literal["update_glossary_subgraph"]]:
+    response = get_chat_model().invoke(refine_translation_prompt(state))
+    return refine_translation_result(state, response)
+
+
+async def arefine_translation(
+    state: TranslateState,
+) -> Command[Literal["update_glossary_subgraph"]]:
+    """Async version of `refine_translation`."""
+    llm = await aget_chat_model()
+    response = await llm.ainvoke(refine_translation_prompt(state))
+    return refine_translation_result(state, response)
+
+
+def remember_translation(
+    state: TranslateState, configuration: TranslateConfiguration
+) -> Command:
+    """Store the approved translation in the memory and report it.
+
+    Writes to SQLite, so the async node runs it in a thread.
+    """
+    if not configuration.use_translation_memory:
+        return Command(goto=END)
+
+    sources = paragraph_contents(state["original_text"])
+    targets = paragraph_contents(state["current_translation"])
+
+    # Only paragraphs that line up one to one can be remembered
+    if len(sources) == len(targets) and get_translation_memory().add_many(
+        zip(sources, targets)
+    ):
+        message = f"Stored {len(sources)} paragraphs in the translation memory."
+    else:
+        message = "The translation was not stored in the translation memory."
+
+    return Command(
+        goto=END,
+        update={
+            "messages": [AIMessage(content=message)],
+        },
+    )
+
+
+def store_translation(
+    state: TranslateState, config: RunnableConfig
 ) -> Command[Literal["__end__"]]:
+    """Store the approved translation paragraph by paragraph in the translation memory."""
+    configuration = TranslateConfiguration.from_runnable_config(config)
+    return remember_translation(state, configuration)
+
+
+async def astore_translation(
+    state: TranslateState, config: RunnableConfig
+) -> Command[Literal["__end__"]]:
+    """Async version of `store_translation`, writing to the memory in a thread."""
+    configuration = TranslateConfiguration.from_runnable_config(config)
+    return await asyncio.to_thread(remember_translation, state, configuration)
+
+
+def update_glossary_prompt(state: TranslateState) -> str:
+    """Build the prompt proposing glossary updates from the user feedback."""
     last_three_messages = state["messages"][-3:]
 
     # Get third last message starting from the last message
     translation_with_errors = last_three_messages[-3]
     user_feedback = last_three_messages[-2]
 
-    prompt = lead_update_glossary_prompt.format(
+    return lead_update_glossary_prompt.format(
         translation_with_errors=translation_with_errors.content,
         user_feedback=user_feedback.content,
         original_text=state["original_text"],
     )
 
-    update_glossary_tools = [ConductUpdate, NoUpdate]
-
-    llm_with_tool = llm.bind_tools(update_glossary_tools)
-    response = llm_with_tool.invoke(prompt)
 
+def update_glossary_result(response) -> Command:
+    """Ask to confirm the proposed terms, if any."""
     # Store the proposed term for confirmation
     if response.tool_calls and len(response.tool_calls) > 0:
         return Command(
@@ -136,10 +372,37 @@ def update_glossary_supervisor(
         )
 
 
-def confirm_glossary(
+def update_glossary_supervisor(
     state: TranslateState,
-) -> Command[Literal["__end__"]]:
-    """Ask user for confirmation before adding term to glossary."""
+) -> Command[Literal["confirm_glossary", "__end__"]]:
+    update_glossary_tools = [ConductUpdate, NoUpdate]
+
+    llm_with_tool = get_model_with_tools(update_glossary_tools)
+    response = llm_with_tool.invoke(update_glossary_prompt(state))
+    return update_glossary_result(response)
+
+
+async def aupdate_glossary_supervisor(
+    state: TranslateState,
+) -> Command[Literal["confirm_glossary", "__end__"]]:
+    """Async version of `update_glossary_supervisor`."""
+    update_glossary_tools = [ConductUpdate, NoUpdate]
+
+    # Create the model off the event loop, the binding is cached
+    await aget_chat_model()
+    llm_with_tool = get_model_with_tools(update_glossary_tools)
+    response = await llm_with_tool.ainvoke(update_glossary_prompt(state))
+    return update_glossary_result(response)
+
+
+def ask_glossary_confirmations(
+    state: TranslateState,
+) -> tuple[list[tuple[str, str, str]], list[str]]:
+    """Ask the user to confirm every proposed term.
+
+    Returns:
+        The accepted (source, target, note) terms and a log line per term.
+    """
     messages = state.get("messages", [])
     most_recent_message = messages[-1]
 
@@ -150,6 +413,7 @@ def confirm_glossary(
     ]
 
     updates_logs = []
+    accepted_sources = []
 
     for conduct_update_call in conduct_update_calls:
         source = conduct_update_call["args"]["source"]
@@ -160,11 +424,24 @@ def confirm_glossary(
         user_response = interrupt({"confirmation_request": confirmation_message})
 
         if user_response.lower().strip() in ["yes", "y", "sí", "si"]:
-            glossary_manager.add_source(source, target, note)
+            accepted_sources.append((source, target, note))
             updates_logs.append(f"✅ Added term '{source}' → '{target}' to glossary.")
         else:
             updates_logs.append(f"❌ Failed to add term '{source}' to glossary.")
 
+    return accepted_sources, updates_logs
+
+
+def confirm_glossary(
+    state: TranslateState,
+) -> Command[Literal["__end__"]]:
+    """Ask user for confirmation before adding term to glossary."""
+    accepted_sources, updates_logs = ask_glossary_confirmations(state)
+
+    # Write all the accepted terms at once
+    if accepted_sources:
+        get_glossary_manager().add_sources(accepted_sources)
+
     return Command(
         goto=END,
         update={
@@ -173,26 +450,76 @@ def confirm_glossary(
     )
 
 
-update_glossary_builder = StateGraph(UpdateGlossaryState)
+async def aconfirm_glossary(
+    state: TranslateState,
+) -> Command[Literal["__end__"]]:
+    """Async version of `confirm_glossary`, writing to the glossary in a thread."""
+    accepted_sources, updates_logs = ask_glossary_confirmations(state)
 
-update_glossary_builder.add_node(
-    "update_glossary_supervisor", update_glossary_supervisor
-)
-update_glossary_builder.add_node("confirm_glossary", confirm_glossary)
+    # Write all the accepted terms at once
+    if accepted_sources:
+        await asyncio.to_thread(get_glossary_manager().add_sources, accepted_sources)
 
-update_glossary_builder.add_edge(START, "update_glossary_supervisor")
+    return Command(
+        goto=END,
+        update={
+            "messages": [AIMessage(content="\n".join(updates_logs))],
+        },
+    )
+
+
+def build_update_glossary_subgraph():
+    """Build the subgraph proposing and confirming glossary updates."""
+    update_glossary_builder = StateGraph(UpdateGlossaryState)
+
+    update_glossary_builder.add_node(
+        "update_glossary_supervisor",
+        RunnableLambda(update_glossary_supervisor, aupdate_glossary_supervisor),
+        destinations=("confirm_glossary", END),
+    )
+    update_glossary_builder.add_node(
+        "confirm_glossary",
+        RunnableLambda(confirm_glossary, aconfirm_glossary),
+        destinations=(END,),
+    )
+
+    update_glossary_builder.add_edge(START, "update_glossary_supervisor")
 
-update_glossary_subgraph = update_glossary_builder.compile()
+    return update_glossary_builder.compile()
 
 
-graph = StateGraph(TranslateState, input_schema=TranslateInputState)
+def build_graph():
+    """Build the translate graph.
+
+    The nodes calling the model or touching the glossary and the translation
+    memory have a sync and an async version, so the graph runs with `invoke`
+    as well as with `ainvoke` without blocking the event loop.
+    """
+    graph = StateGraph(TranslateState, input_schema=TranslateInputState)
+
+    graph.add_node("supervisor", supervisor)
+    graph.add_node(
+        "initial_translation",
+        RunnableLambda(initial_translation, ainitial_translation),
+        destinations=("supervisor",),
+    )
+    graph.add_node(
+        "refine_translation",
+        RunnableLambda(refine_translation, arefine_translation),
+        destinations=("update_glossary_subgraph",),
+    )
+    graph.add_node(
+        "store_translation",
+        RunnableLambda(store_translation, astore_translation),
+        destinations=(END,),
+    )
+    graph.add_node("update_glossary_subgraph", build_update_glossary_subgraph())
+
+    graph.add_edge(START, "initial_translation")
+    graph.add_edge("update_glossary_subgraph", "supervisor")
 
-graph.add_node("supervisor", supervisor)
-graph.add_node("initial_translation", initial_translation)
-graph.add_node("refine_translation", refine_translation)
-graph.add_node("update_glossary_subgraph", update_glossary_subgraph)
+    return graph.compile()
 
-graph.add_edge(START, "initial_translation")
-graph.add_edge("update_glossary_subgraph", "supervisor")
 
-graph = graph.compile()
+# Built on first access, so importing this module stays cheap
+__getattr__ = lazy_attributes(globals(), graph=build_graph)
@@ -1,6 +1,227 @@
+import math
 import re
+from collections import Counter
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+
+WORD_PATTERN = re.compile(r"\b[\w-]+\b")
+
+# Size of the character n-grams used to prefilter candidates. Bigrams are the
+# largest size for which the q-gram lemma still rules out pairs at the usual
+# thresholds: every insertion or deletion destroys at most `q` shared q-grams,
+# so with trigrams the bound is already vacuous at a threshold of 80.
+GRAM_SIZE = 2
+
+
+def _grams(text):
+    """Return the character n-grams of the text with their number of occurrences."""
+    return Counter(text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1))
+
+
+def _min_shared_grams(term_length, window_length, threshold):
+    """Lower bound of the n-grams two strings share if they reach the threshold.
+
+    `fuzz.ratio` is the normalized InDel similarity, so reaching the threshold
+    bounds the number of insertions and deletions between the two strings,
+    which in turn bounds how many n-grams of either string can be destroyed.
+
+    Returns:
+        The minimum number of shared n-grams, or None if the lengths alone
+        already make the threshold unreachable.
+    """
+    length_sum = term_length + window_length
+    # Largest InDel distance that still reaches the threshold (small slack so
+    # floating point rounding never discards a valid pair)
+    max_distance = math.floor(length_sum * (100 - threshold) / 100 + 1e-9)
+    # The distance always has the parity of the length sum
+    max_distance -= (max_distance - length_sum) % 2
+    if max_distance < abs(term_length - window_length):
+        return None
+
+    deletions = (max_distance + term_length - window_length) // 2
+    insertions = max_distance - deletions
+    return max(
+        term_length - GRAM_SIZE + 1 - GRAM_SIZE * deletions - (GRAM_SIZE - 1) * insertions,
+        window_length - GRAM_SIZE + 1 - GRAM_SIZE * insertions - (GRAM_SIZE - 1) * deletions,
+    )
+
+
+class GlossaryMatcher:
+    """Reusable fuzzy matcher for the terms of a glossary.
+
+    Terms are grouped by word count once, so matching a text only tokenizes it
+    once and scores every window of a given length against the terms of that
+    length. With `prefilter`, (term, window) pairs whose lengths or character
+    bigrams make the threshold unreachable are never scored. It returns the
+    same matches, but rapidfuzz scores pairs so fast that skipping them only
+    pays off on some inputs: see `benchmarks/match_words.py`.
+    """
+
+    def __init__(self, glossary, threshold=80, prefilter=False):
+        """Precompile the glossary terms.
+
+        Args:
+            glossary: dict like {"registrar": "secretario/a", "global history": "historia universal"}
+            threshold: similarity threshold (0-100)
+            prefilter: whether to skip pairs that cannot reach the threshold
+        """
+        self.glossary = glossary
+        self.threshold = threshold
+        self.prefilter = prefilter
+        # Number of fuzz.ratio comparisons made by the last call to `match`
+        self.last_comparisons = 0
+
+        # Group the terms by their number of words: {word_count: [term, ...]}
+        self._terms_by_size: dict[int, list[str]] = {}
+        for term in glossary:
+            self._terms_by_size.setdefault(len(term.split()), []).append(term)
+
+        self._term_grams = {}
+        if prefilter:
+            for term in glossary:
+                grams = _grams(term.lower())
+                self._term_grams[term] = (list(grams), max(grams.values(), default=1))
+
+    def match(self, text):
+        """Find the glossary terms that appear in the text.
+
+        Args:
+            text: text to search in
+
+        Returns:
+            dict of matches: {"found_text": "correct_form"}
+        """
+        self.last_comparisons = 0
+        if self.threshold > 100:
+            return {}
+
+        text_lower = text.lower()
+        single_words = WORD_PATTERN.findall(text_lower)
+        text_words = text_lower.split()
+
+        found = {}
+        for size, terms in self._terms_by_size.items():
+            if size == 1:
+                windows = single_words
+            else:
+                windows = [
+                    " ".join(text_words[i : i + size])
+                    for i in range(len(text_words) - size + 1)
+                ]
+            # Deduplicate the windows keeping the position of their first occurrence
+            unique_windows = list(dict.fromkeys(windows))
+            if not unique_windows:
+                continue
+            if self.prefilter:
+                found.update(self._first_matches_filtered(terms, unique_windows))
+            else:
+                found.update(self._first_matches(terms, unique_windows))
+
+        # Build the result in glossary order so duplicated keys resolve as before
+        matches = {}
+        for term, correct_form in self.glossary.items():
+            if term not in found:
+                continue
+            key = term if len(term.split()) == 1 else found[term]
+            matches[key] = correct_form
+
+        return matches
+
+    def _first_matches(self, terms, windows):
+        """Return the first window each term matches: {term: window}."""
+        found = {}
+        for term in terms:
+            results = process.extract(
+                term.lower(),
+                windows,
+                scorer=fuzz.ratio,
+                processor=None,
+                score_cutoff=max(self.threshold, 0),
+                limit=None,
+            )
+            self.last_comparisons += len(windows)
+            if results:
+                found[term] = windows[min(index for _, _, index in results)]
+
+        return found
+
+    def _first_matches_filtered(self, terms, windows):
+        """Return the first window each term matches, scoring only candidates."""
+        # Index the windows by length and by character n-gram
+        windows_by_length: dict[int, set[int]] = {}
+        windows_by_gram: dict[str, set[int]] = {}
+        for index, window in enumerate(windows):
+            windows_by_length.setdefault(len(window), set()).add(index)
+            for gram in _grams(window):
+                windows_by_gram.setdefault(gram, set()).add(index)
+
+        # For each term length: the windows that are always candidates, the
+        # windows that must share n-grams and the fewest n-grams they must share
+        bounds: dict[int, tuple[set[int], set[int], int]] = {}
+
+        found = {}
+        for term in terms:
+            term_lower = term.lower()
+            term_length = len(term_lower)
+            if term_length not in bounds:
+                bounds[term_length] = self._length_bounds(
+                    term_length, windows_by_length
+                )
+            unfiltered, filtered, min_shared = bounds[term_length]
+
+            candidates = set(unfiltered)
+            if filtered:
+                # A shared n-gram accounts for at most `multiplicity` shared
+                # occurrences, so a candidate contains at least `needed` distinct
+                # n-grams of the term and therefore one of its rarest ones
+                grams, multiplicity = self._term_grams[term]
+                needed = math.ceil(min_shared / multiplicity)
+                rarest = sorted(
+                    grams, key=lambda gram: len(windows_by_gram.get(gram, ()))
+                )
+                sharing = set().union(
+                    *(
+                        windows_by_gram.get(gram, ())
+                        for gram in rarest[: len(grams) - needed + 1]
+                    )
+                )
+                candidates |= filtered & sharing
+            if not candidates:
+                continue
+
+            # Score the candidates in a single rapidfuzz call
+            candidate_indexes = sorted(candidates)
+            results = process.extract(
+                term_lower,
+                [windows[index] for index in candidate_indexes],
+                scorer=fuzz.ratio,
+                processor=None,
+                score_cutoff=max(self.threshold, 0),
+                limit=None,
+            )
+            self.last_comparisons += len(candidate_indexes)
+            if results:
+                first = min(position for _, _, position in results)
+                found[term] = windows[candidate_indexes[first]]
+
+        return found
+
+    def _length_bounds(self, term_length, windows_by_length):
+        """Split the windows a term of the given length can reach by n-gram need."""
+        unfiltered = set()
+        filtered = set()
+        min_shared = math.inf
+        for window_length, indexes in windows_by_length.items():
+            shared = _min_shared_grams(term_length, window_length, self.threshold)
+            if shared is None:
+                continue
+            if shared <= 0:
+                unfiltered |= indexes
+            else:
+                filtered |= indexes
+                min_shared = min(min_shared, shared)
+
+        return unfiltered, filtered, min_shared
 
 
 def match_words_from_glossary(glossary, text, threshold=80):
@@ -14,32 +235,4 @@ def match_words_from_glossary(glossary, text, threshold=80):
     Returns:
         dict of matches: {"found_text": "correct_form"}
     """
-    matches = {}
-    text_lower = text.lower()
-
-    # Check each glossary term
-    for term, correct_form in glossary.items():
-        term_words = term.split()
-
-        if len(term_words) == 1:
-            # Single word matching
-            words = re.findall(r"\b[\w-]+\b", text_lower)
-            for word in words:
-                similarity = fuzz.ratio(term.lower(), word)
-                if similarity >= threshold:
-                    matches[term] = correct_form
-                    break  # Only match once per term
-        else:
-            # Multi-word phrase matching using sliding window
-            text_words = text_lower.split()
-            window_size = len(term_words)
-
-            for i in range(len(text_words) - window_size + 1):
-                window = " ".join(text_words[i : i + window_size])
-                similarity = fuzz.ratio(term.lower(), window)
-
-                if similarity >= threshold:
-                    matches[window] = correct_form
-                    break  # Only match once per term
-
-    return matches
+    return GlossaryMatcher(glossary, threshold).match(text)
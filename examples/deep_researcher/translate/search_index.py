@@ -0,0 +1,255 @@
+"""In-memory search index over the entries of a glossary."""
+
+import bisect
+import re
+from typing import Dict
+
+# Searches shorter than this can't be looked up in the trigram index
+GRAM_SIZE = 3
+
+FIELDS = ("source", "target", "note")
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _trigrams(text: str) -> set[str]:
+    """Return the character trigrams of the text."""
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def text_matches(search_lower: str, text_lower: str, prefix: bool = False) -> bool:
+    """Check whether a lowercased text matches a lowercased search text.
+
+    Args:
+        search_lower: Lowercased text to search for.
+        text_lower: Lowercased text to search in.
+        prefix: Only match at the start of the text or of one of its words.
+
+    Returns:
+        True if the text matches.
+    """
+    if not prefix:
+        return search_lower in text_lower
+    return re.search(r"(?<!\w)" + re.escape(search_lower), text_lower) is not None
+
+
+def entry_matches(
+    search_lower: str,
+    source: str,
+    data: Dict[str, str],
+    search_in_notes: bool = True,
+    prefix: bool = False,
+) -> bool:
+    """Check whether a glossary entry matches a lowercased search text."""
+    return (
+        text_matches(search_lower, source.lower(), prefix)
+        or text_matches(search_lower, data["target"].lower(), prefix)
+        or (search_in_notes and text_matches(search_lower, data["note"].lower(), prefix))
+    )
+
+
+def match_rank(search_lower: str, source: str, data: Dict[str, str]) -> tuple:
+    """Sort key ranking a matching glossary entry by match quality.
+
+    Exact sources come first, then sources starting with the search text, then
+    sources with a word starting with it, then any other source match, and
+    finally matches in the target and in the note. Ties favor shorter sources.
+    """
+    rank = 2 * len(FIELDS)
+    source_lower = source.lower()
+    if source_lower == search_lower:
+        rank = 0
+    elif source_lower.startswith(search_lower):
+        rank = 1
+    else:
+        for field_index, text in enumerate(
+            (source_lower, data["target"].lower(), data["note"].lower())
+        ):
+            if text_matches(search_lower, text, prefix=True):
+                rank = 2 + 2 * field_index
+                break
+            if search_lower in text:
+                rank = 3 + 2 * field_index
+                break
+    return (rank, len(source))
+
+
+class GlossarySearchIndex:
+    """Trigram and token index over the sources, targets and notes of a glossary.
+
+    Searches of at least three characters intersect the trigram postings of the
+    search text, and shorter prefix searches look up the sorted tokens, so only
+    a few candidates are checked instead of the whole glossary.
+    """
+
+    def __init__(self, glossary: Dict[str, Dict[str, str]] = None):
+        """Build the index.
+
+        Args:
+            glossary: Dictionary containing the glossary sources.
+        """
+        self._entries: Dict[str, Dict[str, str]] = {}
+        # Position of every entry in the glossary
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        # Lowercased (source, target, note) of every entry
+        self._texts: Dict[str, tuple[str, str, str]] = {}
+        # {field: {trigram: {source, ...}}}
+        self._grams = {field: {} for field in FIELDS}
+        # {field: {token: {source, ...}}} and the sorted tokens of every field
+        self._tokens = {field: {} for field in FIELDS}
+        self._sorted_tokens = {field: [] for field in FIELDS}
+
+        for source, data in (glossary or {}).items():
+            self.add(source, data)
+
+    def __len__(self) -> int:
+        """Return the number of indexed entries."""
+        return len(self._entries)
+
+    def add(self, source: str, data: Dict[str, str]):
+        """Add or replace an entry.
+
+        A replaced entry keeps its position, like in a dictionary.
+
+        Args:
+            source: The glossary source.
+            data: Dictionary with 'target' and 'note' keys.
+        """
+        if source in self._entries:
+            self._unindex(source)
+        else:
+            self._positions[source] = self._next_position
+            self._next_position += 1
+
+        texts = (source.lower(), data["target"].lower(), data["note"].lower())
+        self._entries[source] = data
+        self._texts[source] = texts
+
+        for field, text in zip(FIELDS, texts):
+            for gram in _trigrams(text):
+                self._grams[field].setdefault(gram, set()).add(source)
+            for token in set(TOKEN_PATTERN.findall(text)):
+                postings = self._tokens[field].setdefault(token, set())
+                if not postings:
+                    bisect.insort(self._sorted_tokens[field], token)
+                postings.add(source)
+
+    def remove(self, source: str):
+        """Remove an entry if it is indexed.
+
+        Args:
+            source: The glossary source.
+        """
+        if source not in self._entries:
+            return
+
+        self._unindex(source)
+        del self._entries[source]
+        del self._positions[source]
+
+    def _unindex(self, source: str):
+        """Remove the postings of an entry."""
+        for field, text in zip(FIELDS, self._texts.pop(source)):
+            for gram in _trigrams(text):
+                postings = self._grams[field][gram]
+                postings.discard(source)
+                if not postings:
+                    del self._grams[field][gram]
+            for token in set(TOKEN_PATTERN.findall(text)):
+                postings = self._tokens[field][token]
+                postings.discard(source)
+                if not postings:
+                    del self._tokens[field][token]
+                    sorted_tokens = self._sorted_tokens[field]
+                    del sorted_tokens[bisect.bisect_left(sorted_tokens, token)]
+
+    def update(
+        self,
+        old_glossary: Dict[str, Dict[str, str]],
+        new_glossary: Dict[str, Dict[str, str]],
+    ):
+        """Apply the differences between two versions of the glossary.
+
+        Args:
+            old_glossary: The glossary the index currently reflects.
+            new_glossary: The glossary the index should reflect.
+        """
+        for source in old_glossary.keys() - new_glossary.keys():
+            self.remove(source)
+        for source, data in new_glossary.items():
+            if old_glossary.get(source) != data:
+                self.add(source, data)
+
+    def search(
+        self,
+        search_text: str,
+        search_in_notes: bool = True,
+        prefix: bool = False,
+        rank: bool = False,
+    ) -> Dict[str, Dict[str, str]]:
+        """Search for entries containing the search text.
+
+        Args:
+            search_text: Text to search for.
+            search_in_notes: Whether to also search in notes.
+            prefix: Only match at the start of a word.
+            rank: Order the results by match quality instead of glossary order.
+
+        Returns:
+            Dictionary of matching sources.
+        """
+        search_lower = search_text.lower()
+        fields = FIELDS if search_in_notes else FIELDS[:2]
+
+        candidates = set()
+        for field in fields:
+            field_candidates = self._field_candidates(field, search_lower, prefix)
+            if field_candidates is None:
+                # Nothing to look up: check every entry
+                candidates = self._entries.keys()
+                break
+            candidates |= field_candidates
+
+        matches = [
+            source
+            for source in candidates
+            if any(
+                text_matches(search_lower, text, prefix)
+                for text in self._texts[source][: len(fields)]
+            )
+        ]
+
+        # Keep the glossary order, like a linear scan would, also between ties
+        matches.sort(key=self._positions.__getitem__)
+        if rank:
+            matches.sort(
+                key=lambda source: match_rank(
+                    search_lower, source, self._entries[source]
+                )
+            )
+
+        return {source: self._entries[source] for source in matches}
+
+    def _field_candidates(
+        self, field: str, search_lower: str, prefix: bool
+    ) -> set[str] | None:
+        """Get the entries that may match in a field, or None if unknown."""
+        if len(search_lower) >= GRAM_SIZE:
+            postings = [
+                self._grams[field].get(gram, set()) for gram in _trigrams(search_lower)
+            ]
+            return set.intersection(*sorted(postings, key=len))
+
+        if prefix and TOKEN_PATTERN.fullmatch(search_lower):
+            sorted_tokens = self._sorted_tokens[field]
+            candidates = set()
+            index = bisect.bisect_left(sorted_tokens, search_lower)
+            while index < len(sorted_tokens) and sorted_tokens[index].startswith(
+                search_lower
+            ):
+                candidates |= self._tokens[field][sorted_tokens[index]]
+                index += 1
+            return candidates
+
+        return None
@@ -38,9 +38,7 @@ class TranslateState(TranslateInputState):
 
     messages: Annotated[list[BaseMessage], add_messages]
     original_text: str = ""
-    current_translation: str = (
-        ""  # TODO: REMOVE, THIS IS FOR DEBUGGING PURPOSES IN LANGGRAPH STUDIO
-    )
+    current_translation: str = ""
     words_to_match: dict[
         str, str
     ] = {}  # TODO: REMOVE, THIS IS FOR DEBUGGING PURPOSES IN LANGGRAPH STUDIO
@@ -0,0 +1,205 @@
+"""Translation memory of approved segment translations, stored in SQLite."""
+
+import bisect
+import hashlib
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Tuple
+
+from rapidfuzz import fuzz, process
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    source_hash TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+"""
+
+UPSERT_SEGMENT = """
+INSERT INTO segments (source_hash, source, target) VALUES (?, ?, ?)
+ON CONFLICT (source_hash) DO UPDATE SET target = excluded.target
+"""
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+def normalize_segment(segment: str) -> str:
+    """Collapse the whitespace of a segment so layout changes still match."""
+    return " ".join(segment.split())
+
+
+def segment_hash(segment: str) -> str:
+    """Hash of a normalized segment, used for exact lookups."""
+    return hashlib.sha256(segment.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Approved translations of source segments, looked up exactly or fuzzily.
+
+    Exact matches are found by the hash of the normalized segment. Fuzzy
+    matches use `fuzz.ratio`, only against stored segments whose length can
+    reach the threshold, and never reuse a translation if the numbers in the
+    two segments differ.
+    """
+
+    def __init__(self, db_path: str = None):
+        """Initialize the translation memory.
+
+        Args:
+            db_path: Path to the SQLite database. If None, uses default path.
+        """
+        if db_path is None:
+            # Default to translation_memory.sqlite in the same directory as this file
+            self.db_path = Path(__file__).parent / "translation_memory.sqlite"
+        else:
+            self.db_path = Path(db_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._cursor() as cur:
+            cur.executescript(SCHEMA)
+
+        # Stored sources sorted by length, with their lengths, for fuzzy lookups
+        self._sources = None
+        self._lengths = None
+        # PRAGMA data_version changes whenever another connection commits
+        self._sources_version = None
+
+    @contextmanager
+    def _cursor(self):
+        """Get a cursor, committing on success and rolling back on error."""
+        with self._lock:
+            cur = self._conn.cursor()
+            try:
+                yield cur
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def lookup(self, segment: str, threshold: float = 101) -> str | None:
+        """Find the translation of a segment.
+
+        Args:
+            segment: Source segment to translate.
+            threshold: Minimum fuzz.ratio similarity (0-100) of a fuzzy match.
+                Values above 100, the default, only allow exact matches: the
+                translation of a fuzzy match is returned as it is, so it may
+                not translate what differs.
+
+        Returns:
+            The stored translation, or None if there is no close enough segment.
+        """
+        normalized = normalize_segment(segment)
+        if not normalized:
+            return None
+
+        with self._cursor() as cur:
+            row = cur.execute(
+                "SELECT target FROM segments WHERE source_hash = ?",
+                (segment_hash(normalized),),
+            ).fetchone()
+        if row is not None:
+            return row[0]
+        if threshold > 100:
+            return None
+
+        source = self._closest_source(normalized, threshold)
+        if source is None:
+            return None
+        with self._cursor() as cur:
+            row = cur.execute(
+                "SELECT target FROM segments WHERE source_hash = ?",
+                (segment_hash(source),),
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _closest_source(self, normalized: str, threshold: float) -> str | None:
+        """Get the most similar stored source with the same numbers, if any."""
+        self._load_sources()
+
+        # fuzz.ratio = 200 * matches / (l1 + l2) and matches <= min(l1, l2),
+        # so only stored lengths in this range can reach the threshold
+        length = len(normalized)
+        ratio = max(threshold, 1) / 100
+        low = bisect.bisect_left(self._lengths, length * ratio / (2 - ratio) - 1e-9)
+        high = bisect.bisect_right(self._lengths, length * (2 - ratio) / ratio + 1e-9)
+
+        numbers = NUMBER_PATTERN.findall(normalized)
+        results = process.extract(
+            normalized,
+            self._sources[low:high],
+            scorer=fuzz.ratio,
+            processor=None,
+            score_cutoff=max(threshold, 0),
+            limit=None,
+        )
+        for source, _, _ in sorted(results, key=lambda result: -result[1]):
+            if NUMBER_PATTERN.findall(source) == numbers:
+                return source
+        return None
+
+    def _load_sources(self):
+        """Load the stored sources unless the database is unchanged."""
+        with self._cursor() as cur:
+            version = cur.execute("PRAGMA data_version").fetchone()[0]
+            if self._sources is not None and version == self._sources_version:
+                return
+            rows = cur.execute("SELECT source FROM segments").fetchall()
+
+        self._sources = sorted((source for (source,) in rows), key=len)
+        self._lengths = [len(source) for source in self._sources]
+        self._sources_version = version
+
+    def add(self, source: str, target: str) -> bool:
+        """Store the approved translation of a segment.
+
+        Args:
+            source: Source segment.
+            target: Its approved translation.
+
+        Returns:
+            True if stored successfully, False otherwise.
+        """
+        return self.add_many([(source, target)])
+
+    def add_many(self, segments: Iterable[Tuple[str, str]]) -> bool:
+        """Store several approved translations in a single transaction.
+
+        Args:
+            segments: (source, target) tuples.
+
+        Returns:
+            True if stored successfully, False otherwise.
+        """
+        rows = []
+        for source, target in segments:
+            normalized = normalize_segment(source)
+            if normalized and target.strip():
+                rows.append((segment_hash(normalized), normalized, target.strip()))
+
+        try:
+            with self._cursor() as cur:
+                cur.executemany(UPSERT_SEGMENT, rows)
+        except sqlite3.Error as e:
+            print(f"Error writing translation memory to {self.db_path}: {e}")
+            return False
+
+        self._sources = None
+        return True
+
+    def __len__(self) -> int:
+        """Return the number of stored segments."""
+        with self._cursor() as cur:
+            return cur.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
@@ -1,7 +1,6 @@
 from typing import Literal
 
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -14,6 +13,8 @@ from langgraph.graph.message import add_messages
 from langgraph.types import Command
 from typing_extensions import Annotated
 
+from examples.common.lazy import lazy_attributes
+from examples.common.llm import get_chat_model
 from examples.deep_researcher.configuration.index import Configuration
 
 # Load environment variables
@@ -38,8 +39,8 @@ class InputState(MessagesState):
 
 
 def create_llm(model_name: str = DEFAULT_MODEL):
-    """Create and return a language model instance."""
-    return init_chat_model(model_name)
+    """Get the language model instance for a model name."""
+    return get_chat_model(model_name)
 
 
 def generate_chatbot_response(
@@ -55,11 +56,11 @@ def generate_chatbot_response(
         Command to move to rating step
     """
     # Get model from configuration or use default
-    model_name = Configuration.from_runnable_config(config).llm_model
-    print(f"Using model: {model_name}")
+    configuration = Configuration.from_runnable_config(config)
+    print(f"Using model: {configuration.llm_model}")
 
-    # Create LLM and generate response
-    llm = create_llm(model_name)
+    # Reuse the LLM of this configuration and generate response
+    llm = configuration.chat_model()
     response = llm.invoke(state["messages"])
 
     return Command(
@@ -114,11 +115,11 @@ def build_graph():
     return graph_builder.compile()
 
 
-# Create the graph instance
-graph = build_graph()
+# Create the graph instance on first access, so importing this module stays cheap
+__getattr__ = lazy_attributes(globals(), graph=build_graph)
 
 
-def stream_conversation(user_input: str):
+def stream_conversation(graph, user_input: str):
     """Stream the conversation updates."""
     events = graph.stream(
         {"messages": [{"role": "user", "content": user_input}]},
@@ -131,6 +132,7 @@ def stream_conversation(user_input: str):
 def main():
     """Run the chatbot."""
     print("Chatbot started! Type 'quit', 'exit', or 'q' to end the conversation.")
+    graph = build_graph()
 
     while True:
         try:
@@ -138,7 +140,7 @@ def main():
             if user_input.lower() in ["quit", "exit", "q"]:
                 print("Goodbye!")
                 break
-            stream_conversation(user_input)
+            stream_conversation(graph, user_input)
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
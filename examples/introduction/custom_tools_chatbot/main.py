@@ -1,15 +1,19 @@
+import functools
 import os
-from typing import Annotated
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any, Optional, Sequence
 from dotenv import load_dotenv
-from langchain_core.tools import Tool
-from langchain.chat_models import init_chat_model
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.tools import BaseTool, Tool
 from typing_extensions import TypedDict
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from examples.common.llm import get_model_with_tools
+
 # Load environment variables
 load_dotenv()
 
@@ -44,17 +48,13 @@ tools = [
     ),
 ]
 
-# Initialize the language model and bind tools
-llm = init_chat_model("google_genai:gemini-2.5-flash-lite")
-llm_with_tools = llm.bind_tools(tools)
-
-# Create a tool node to execute tools
-tool_node = ToolNode(tools)
+# Most compiled graphs kept, one per tool set and checkpointer
+MAX_CACHED_GRAPHS = 8
 
-# Define the chatbot node
-def chatbot(state: State) -> dict:
+# Define the chatbot node, the model with the tools bound is created on first use
+def chatbot(state: State, tools: Sequence[BaseTool] = tools) -> dict:
     """Process the state and generate a response using the LLM."""
-    return {"messages": [llm_with_tools.invoke(state["messages"])]}
+    return {"messages": [get_model_with_tools(tools).invoke(state["messages"])]}
 
 # Define routing logic for the graph
 def should_continue(state: State) -> str:
@@ -67,26 +67,55 @@ def should_continue(state: State) -> str:
     return END
 
 # Build the conversation graph
-def build_graph() -> CompiledStateGraph:
-    """Create and configure the state graph for the chatbot."""
+def build_graph(
+    tools: Sequence[BaseTool] = tools, checkpointer: Optional[BaseCheckpointSaver] = None
+) -> CompiledStateGraph:
+    """Create and configure the state graph for the chatbot.
+
+    Compiling takes much longer than running a turn, use `get_graph` to
+    compile once.
+    """
     graph_builder = StateGraph(State)
     
     # Add nodes
-    graph_builder.add_node("chatbot", chatbot)
-    graph_builder.add_node("tools", tool_node)
+    graph_builder.add_node("chatbot", functools.partial(chatbot, tools=tools))
+    graph_builder.add_node("tools", ToolNode(tools))
     
     # Add edges
     graph_builder.add_edge(START, "chatbot")
     graph_builder.add_conditional_edges("chatbot", should_continue)
     graph_builder.add_edge("tools", "chatbot")
     
-    compiled_graph = graph_builder.compile()
+    compiled_graph = graph_builder.compile(checkpointer=checkpointer)
     return compiled_graph
 
+_graphs: OrderedDict[tuple[int, ...], tuple[Any, CompiledStateGraph]] = OrderedDict()
+_graphs_lock = threading.Lock()
+
+def get_graph(
+    tools: Sequence[BaseTool] = tools, checkpointer: Optional[BaseCheckpointSaver] = None
+) -> CompiledStateGraph:
+    """Get the graph for a tool set and checkpointer, compiled on first use.
+
+    Tools and checkpointers are compared by identity. The cached entry holds
+    them, so their ids can't be reused by other objects while it is cached.
+    """
+    tools = tuple(tools)
+    key = (*map(id, tools), id(checkpointer))
+    with _graphs_lock:
+        if key in _graphs:
+            _graphs.move_to_end(key)
+            return _graphs[key][1]
+        graph = build_graph(tools, checkpointer)
+        _graphs[key] = ((tools, checkpointer), graph)
+        while len(_graphs) > MAX_CACHED_GRAPHS:
+            _graphs.popitem(last=False)
+    return graph
+
 # Stream graph updates for user input
 def stream_graph_updates(user_input: str) -> None:
     """Stream the chatbot's responses for the given user input."""
-    graph = build_graph()
+    graph = get_graph()
     events = graph.stream(
         {"messages": [{"role": "user", "content": user_input}]},
         stream_mode="values",
@@ -112,4 +141,4 @@ def main() -> None:
             break
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,41 +1,48 @@
+import functools
 import os
 from typing import Annotated
 
-from typing_extensions import TypedDict
-
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langchain.chat_models import init_chat_model
 from dotenv import load_dotenv
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain_core.runnables import RunnableConfig
 
+from examples.common.checkpoint.bounded_memory import BoundedInMemorySaver
+from examples.common.trimming import TrimmingState, trimmed_prompt
+
 load_dotenv()
 
-class State(TypedDict):
+class State(TrimmingState):
     messages: Annotated[list, add_messages]
     
 
-llm = init_chat_model("google_genai:gemini-2.5-flash-lite")
+@functools.cache
+def get_llm():
+    return init_chat_model("google_genai:gemini-2.5-flash-lite")
 
-def chatbot(state: State):
-    return {"messages": [llm.invoke(state["messages"])]}
+def chatbot(state: State, config: RunnableConfig):
+    # The whole history, unless trimming is enabled in the configuration
+    prompt, update = trimmed_prompt(state, config, get_llm())
+    return {"messages": [get_llm().invoke(prompt)], **update}
 
-graph_builder = StateGraph(State)
+def build_graph():
+    graph_builder = StateGraph(State)
 
-graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_node("chatbot", chatbot)
 
-graph_builder.add_edge(START, "chatbot")
+    graph_builder.add_edge(START, "chatbot")
 
-graph_builder.add_edge("chatbot", END)
+    graph_builder.add_edge("chatbot", END)
 
-checkpointer = InMemorySaver()
+    # Keeps the most recently used threads only, so memory stays bounded
+    checkpointer = BoundedInMemorySaver()
 
-graph = graph_builder.compile(checkpointer=checkpointer)
+    return graph_builder.compile(checkpointer=checkpointer)
 
 config = RunnableConfig({"configurable": {"thread_id": "1"}})
 
-def stream_graph_updates(user_input: str):
+def stream_graph_updates(graph, user_input: str):
     events = graph.stream(
         {"messages": [{"role": "user", "content": user_input}]},
         config,
@@ -45,16 +52,22 @@ def stream_graph_updates(user_input: str):
         event["messages"][-1].pretty_print()
 
 
-while True:
-    try:
-        user_input = input("User: ")
-        if user_input.lower() in ["quit", "exit", "q"]:
-            print("Goodbye!")
+def main():
+    graph = build_graph()
+
+    while True:
+        try:
+            user_input = input("User: ")
+            if user_input.lower() in ["quit", "exit", "q"]:
+                print("Goodbye!")
+                break
+            stream_graph_updates(graph, user_input)
+        except:
+            # fallback if input() is not available
+            user_input = "What do you know about LangGraph?"
+            print("User: " + user_input)
+            stream_graph_updates(graph, user_input)
             break
-        stream_graph_updates(user_input)
-    except:
-        # fallback if input() is not available
-        user_input = "What do you know about LangGraph?"
-        print("User: " + user_input)
-        stream_graph_updates(user_input)
-        break
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,6 @@ load_dotenv()
 
 
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite")
-
-bound = llm.bind_tools([TelegramAndTrustFallPreferences], 
-                        tool_choice="TelegramAndTrustFallPreferences")
-
-bound = create_extractor(
-    llm,
-    tools=[TelegramAndTrustFallPreferences],
-    tool_choice="TelegramAndTrustFallPreferences",
-)
-
 conversation = """Operator: How may I assist with your telegram, sir?
 Customer: I need to send a message about our trust fall exercise.
 Operator: Certainly. Morse code or standard encoding?
@@ -31,17 +20,27 @@ Operator: Done. Shall I use our "Daredevil" paper for this daring message?
 Customer: Perfect! Send it by your fastest carrier pigeon.
 Operator: It'll be there within the hour, sir."""
 
-result = bound.invoke(f"""Extract the preferences from the following conversation:
-<convo>
-{conversation}
-</convo>""") 
-
-result = bound.invoke(
-    f"""Extract the preferences from the following conversation:
+prompt = f"""Extract the preferences from the following conversation:
 <convo>
 {conversation}
 </convo>"""
-)
 
-# Option 1: Rich pretty print (most beautiful)
-rprint(result)
+
+def main():
+    """Extract the preferences of the conversation with trustcall."""
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite")
+
+    bound = create_extractor(
+        llm,
+        tools=[TelegramAndTrustFallPreferences],
+        tool_choice="TelegramAndTrustFallPreferences",
+    )
+
+    result = bound.invoke(prompt)
+
+    # Option 1: Rich pretty print (most beautiful)
+    rprint(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import sqlite3
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from examples.common.checkpoint.bounded_memory import BoundedInMemorySaver
+
+
+def put(saver, thread_id: str):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, empty_checkpoint(), {}, {})
+
+
+def test_delete_thread_deletes_spilled_copy():
+    spill = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    saver = BoundedInMemorySaver(max_threads=1, spill=spill)
+    put(saver, "A")
+    put(saver, "B")
+    assert saver.evictions == 1
+    assert list(spill.list({"configurable": {"thread_id": "A"}}))
+
+    saver.delete_thread("A")
+    assert saver.get_tuple({"configurable": {"thread_id": "A"}}) is None
+    assert not list(spill.list({"configurable": {"thread_id": "A"}}))
+    assert saver.thread_count == 1
+
+
+def test_eviction_keeps_spilled_copy():
+    spill = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    saver = BoundedInMemorySaver(max_threads=1, spill=spill)
+    put(saver, "A")
+    put(saver, "B")
+    assert saver.get_tuple({"configurable": {"thread_id": "A"}}) is not None
+    assert saver.restored == 1
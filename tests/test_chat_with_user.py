@@ -0,0 +1,35 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from examples.deep_researcher import chat_with_user
+
+
+def test_messages_are_folded_once(monkeypatch):
+    folded = []
+
+    def summarize(summary, messages):
+        folded.extend(message.content for message in messages)
+        return "summary"
+
+    monkeypatch.setattr(chat_with_user, "summarize", summarize)
+    config = {
+        "configurable": {
+            "incremental_summary": True,
+            "message_window": 4,
+            "summary_interval": 2,
+        }
+    }
+    messages = [HumanMessage(content=str(index), id=str(index)) for index in range(10)]
+    state = {"messages": messages, "summary": "", "summarized_message_count": 0}
+
+    update = chat_with_user.create_summary(state, config).update
+    assert update["summarized_message_count"] == 6
+    state.update(update)
+
+    state["messages"] = messages + [
+        AIMessage(content=str(index), id=str(index)) for index in range(10, 14)
+    ]
+    assert chat_with_user.route_start(state, config) == "update_summary"
+    state.update(chat_with_user.update_summary(state, config))
+
+    assert folded == [str(index) for index in range(10)]
+    assert state["summarized_message_count"] == 10
@@ -0,0 +1,40 @@
+import difflib
+
+import pytest
+
+from examples.deep_researcher.document_edits import PatchError, apply_unified_diff
+
+
+def unified_diff(old: str, new: str) -> str:
+    return "".join(
+        difflib.unified_diff(
+            old.splitlines(keepends=True), new.splitlines(keepends=True), "a", "b"
+        )
+    )
+
+
+def test_removes_lines_starting_with_dashes():
+    old = "# Title\n\n---\n\nBody\n-- sig\n"
+    new = "# Title\n\nBody\n"
+    document, _ = apply_unified_diff(old, unified_diff(old, new))
+    assert document == new
+
+
+def test_adds_lines_starting_with_pluses():
+    old = "x\n"
+    new = "x\n++y\n"
+    document, _ = apply_unified_diff(old, unified_diff(old, new))
+    assert document == new
+
+
+def test_keeps_empty_context_lines_without_space():
+    old = "a\n\nb\n"
+    diff = "@@ -1,3 +1,3 @@\n a\n\n-b\n+c\n"
+    assert apply_unified_diff(old, diff) == ("a\n\nc\n", 1)
+
+
+def test_rejects_context_lines_without_leading_space():
+    old = "alpha\nbeta\n"
+    diff = "@@ -1,2 +1,2 @@\nalpha\n-beta\n+gamma\n"
+    with pytest.raises(PatchError):
+        apply_unified_diff(old, diff)
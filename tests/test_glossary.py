@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+
+import pytest
+
+from examples.deep_researcher.translate.glossary_manager import GlossaryManager
+from examples.deep_researcher.translate.glossary_store import SqliteGlossaryStore
+
+
+def test_store_batch_rolls_back_on_failed_write(tmp_path):
+    store = SqliteGlossaryStore(str(tmp_path / "glossary.sqlite"))
+    store.add_source("bush", "arbusto")
+    with pytest.raises(sqlite3.IntegrityError):
+        with store.batch():
+            store.add_source("tree", "árbol")
+            store.remove_source("bush")
+            # target is NOT NULL
+            store.add_source("leaf", None)
+    assert store.load_glossary() == {"bush": {"target": "arbusto", "note": ""}}
+
+    # Outside a batch, failed writes still return False
+    assert store.add_source("leaf", None) is False
+    store.close()
+
+
+def test_manager_batch_raises_when_save_fails(tmp_path, monkeypatch):
+    manager = GlossaryManager(str(tmp_path / "glossary.json"))
+    monkeypatch.setattr(manager, "save_glossary", lambda glossary: False)
+    with pytest.raises(OSError):
+        with manager.batch():
+            manager.add_source("tree", "árbol")
+
+
+def test_manager_search_during_edits(tmp_path):
+    manager = GlossaryManager(str(tmp_path / "glossary.json"))
+    manager.add_sources((f"tree {index}", f"árbol {index}", "") for index in range(200))
+    errors = []
+
+    def search():
+        try:
+            for _ in range(200):
+                manager.search_sources("tree", prefix=True)
+        except Exception as e:
+            errors.append(e)
+
+    def edit():
+        for index in range(200, 240):
+            manager.add_source(f"tree {index}", f"árbol {index}")
+            manager.remove_source(f"tree {index - 200}")
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    threads.append(threading.Thread(target=edit))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(manager.search_sources("tree")) == 200
+
+
+@pytest.mark.parametrize("search_text", ["ÉTÉ", "été", "STRASSE", "straße", "İstanbul", "tree"])
+def test_store_search_matches_manager(tmp_path, search_text):
+    sources = [
+        ("Été", "summer", ""),
+        ("straße", "street", "Not STRASSE"),
+        ("İstanbul", "Istanbul", ""),
+        ("tree", "árbol", "Also ÁRBOL"),
+    ]
+    manager = GlossaryManager(str(tmp_path / "glossary.json"))
+    manager.add_sources(sources)
+    store = SqliteGlossaryStore(str(tmp_path / "glossary.sqlite"))
+    store.add_sources(sources)
+
+    assert store.search_sources(search_text) == manager.search_sources(search_text)
+    store.close()
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from examples.common.llm import ChatModelRegistry
+
+
+def failing_factory(model, **params):
+    raise ValueError(f"Unknown model {model}")
+
+
+def test_failed_creations_release_their_lock():
+    registry = ChatModelRegistry(factory=failing_factory)
+    for index in range(3):
+        with pytest.raises(ValueError):
+            registry.get(f"provider:model-{index}")
+    with pytest.raises(ValueError):
+        asyncio.run(registry.aget("provider:async-model"))
+    with pytest.raises(ValueError):
+        registry.bind("tools", lambda chat_model: chat_model, "provider:bound-model")
+
+    assert registry._creating == {}
+    assert len(registry) == 0
+
+
+def test_created_model_is_cached():
+    registry = ChatModelRegistry(factory=lambda model, **params: object())
+    assert registry.get("provider:model") is registry.get("provider:model")
+    assert registry._creating == {}
+    assert (registry.hits, registry.misses) == (1, 1)
@@ -0,0 +1,84 @@
+import contextlib
+import sqlite3
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from examples.common.checkpoint.retention import (
+    RetentionPolicy,
+    apply_retention,
+    incremental_vacuum_enabled,
+    prune_old_checkpoints,
+    prune_orphan_messages,
+    start_retention,
+)
+from examples.common.checkpoint.serde import CompressedSerializer, MessageStore
+from examples.common.checkpoint.sqlite import sqlite_saver
+
+
+@pytest.mark.parametrize("keep_last", [0, -1])
+def test_keep_last_below_one_is_rejected(keep_last):
+    with pytest.raises(ValueError):
+        RetentionPolicy(keep_last=keep_last)
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE checkpoints (thread_id, checkpoint_ns, checkpoint_id)")
+    conn.execute("INSERT INTO checkpoints VALUES ('thread', '', 'checkpoint')")
+    with pytest.raises(ValueError):
+        prune_old_checkpoints(conn, keep_last)
+    policy = RetentionPolicy()
+    policy.keep_last = keep_last
+    with pytest.raises(ValueError):
+        apply_retention(conn, policy)
+    assert conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone() == (1,)
+
+
+def test_prune_orphan_messages(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    messages = MessageStore(path)
+    with sqlite_saver(path, serde=CompressedSerializer(messages=messages)) as saver:
+        for thread_id in ("kept", "deleted"):
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {
+                "messages": [HumanMessage(content="Shared"), HumanMessage(content=thread_id)]
+            }
+            saver.put(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}},
+                checkpoint,
+                {},
+                {},
+            )
+        saver.delete_thread("deleted")
+
+        conn = sqlite3.connect(path)
+        assert prune_orphan_messages(conn) == 0
+        assert prune_orphan_messages(conn, grace_seconds=0) == 1
+        assert conn.execute("SELECT COUNT(*) FROM checkpoint_messages").fetchone() == (2,)
+        conn.close()
+
+        kept = saver.get_tuple({"configurable": {"thread_id": "kept"}})
+        assert [message.content for message in kept.checkpoint["channel_values"]["messages"]] == [
+            "Shared",
+            "kept",
+        ]
+    messages.close()
+
+
+def test_retention_thread_enables_vacuum(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    with sqlite_saver(path) as saver:
+        config = {"configurable": {"thread_id": "thread", "checkpoint_ns": ""}}
+        saver.put(config, empty_checkpoint(), {}, {})
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        assert not incremental_vacuum_enabled(conn)
+
+    thread = start_retention(path, RetentionPolicy(keep_last=1), interval=60, enable_vacuum=True)
+    deadline = time.monotonic() + 10
+    while thread.last_report is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    thread.stop()
+    assert thread.last_report is not None
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        assert incremental_vacuum_enabled(conn)
@@ -0,0 +1,14 @@
+from examples.deep_researcher.translate.configuration import TranslateConfiguration
+from examples.deep_researcher.translate.translation_memory import TranslationMemory
+
+
+def test_fuzzy_matches_are_opt_in(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.sqlite"))
+    memory.add("The cat sleeps on the red sofa.", "El gato duerme en el sofá rojo.")
+    similar = "The cat sleeps on the blue sofa."
+
+    assert memory.lookup(similar) is None
+    assert memory.lookup(similar, TranslateConfiguration().translation_memory_threshold) is None
+    assert memory.lookup(similar, 80) == "El gato duerme en el sofá rojo."
+    assert memory.lookup("The  cat sleeps on the red sofa.") == "El gato duerme en el sofá rojo."
+    memory.close()